@@ -3,11 +3,26 @@
 负责计算主题热度分数和总点赞数
 """
 import logging
+import time
+from dataclasses import dataclass, replace
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 
 from .database import db_manager
 
+# 北京时区（UTC+8），模块级缓存避免每次调用重复构造
+_BEIJING_TZ = timezone(timedelta(hours=8))
+
+
+@dataclass(frozen=True, slots=True)
+class HotnessWeights:
+    """热度计算权重配置"""
+    view_weight: float = 1.0         # 浏览数权重
+    reply_weight: float = 5.0        # 回复数权重
+    like_weight: float = 3.0         # 点赞数权重
+    time_decay_hours: int = 168      # 时间衰减周期：7天
+    max_score: float = 999999.0      # 热度分数最大值限制
+
 
 class HotnessAnalyzer:
     """热度分析器"""
@@ -17,15 +32,21 @@ class HotnessAnalyzer:
         self.db = db_manager
         
         # 热度计算权重配置
-        self.view_weight = 1.0      # 浏览数权重
-        self.reply_weight = 5.0     # 回复数权重  
-        self.like_weight = 3.0      # 点赞数权重
-        self.time_decay_hours = 168  # 时间衰减周期：7天
-        self.max_hotness_score = 999999.0  # 热度分数最大值限制
+        self.weights = HotnessWeights()
+
+        # 热度统计结果的短时缓存，避免短时间内重复执行聚合扫描
+        self.stats_cache_ttl = 60  # 秒
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_cache_time = 0.0
     
     def get_beijing_time(self) -> datetime:
         """获取当前北京时间"""
-        return datetime.now(timezone.utc) + timedelta(hours=8)
+        return datetime.now(_BEIJING_TZ)
+
+    def invalidate_stats_cache(self):
+        """清除热度统计缓存（热度数据发生变化后调用）"""
+        self._stats_cache = None
+        self._stats_cache_time = 0.0
     
     def update_total_likes(self, topic_ids: List[int] = None) -> int:
         """
@@ -39,6 +60,7 @@ class HotnessAnalyzer:
         """
         try:
             updated_count = self.db.update_total_likes(topic_ids)
+            self.invalidate_stats_cache()
             self.logger.info(f"成功更新 {updated_count} 个主题的总点赞数")
             return updated_count
         except Exception as e:
@@ -49,37 +71,45 @@ class HotnessAnalyzer:
                             view_weight: Optional[float] = None,
                             reply_weight: Optional[float] = None,
                             like_weight: Optional[float] = None,
-                            time_decay_hours: Optional[int] = None) -> int:
+                            time_decay_hours: Optional[int] = None,
+                            weights: Optional[HotnessWeights] = None) -> int:
         """
         更新主题的热度分数
         
         Args:
             topic_ids: 指定要更新的主题ID列表，None表示更新所有主题
-            view_weight: 浏览数权重，None使用默认值
-            reply_weight: 回复数权重，None使用默认值
-            like_weight: 点赞数权重，None使用默认值
-            time_decay_hours: 时间衰减周期（小时），None使用默认值
+            view_weight: 浏览数权重，None使用weights中的值（兼容旧接口）
+            reply_weight: 回复数权重，None使用weights中的值（兼容旧接口）
+            like_weight: 点赞数权重，None使用weights中的值（兼容旧接口）
+            time_decay_hours: 时间衰减周期（小时），None使用weights中的值（兼容旧接口）
+            weights: 热度权重配置，None使用默认配置
             
         Returns:
             更新的主题数量
         """
         try:
-            # 使用提供的权重或默认权重
-            vw = view_weight if view_weight is not None else self.view_weight
-            rw = reply_weight if reply_weight is not None else self.reply_weight
-            lw = like_weight if like_weight is not None else self.like_weight
-            tdh = time_decay_hours if time_decay_hours is not None else self.time_decay_hours
+            weights = weights or self.weights
+            if view_weight is not None or reply_weight is not None or \
+                    like_weight is not None or time_decay_hours is not None:
+                overrides = {
+                    'view_weight': view_weight,
+                    'reply_weight': reply_weight,
+                    'like_weight': like_weight,
+                    'time_decay_hours': time_decay_hours
+                }
+                weights = replace(weights, **{k: v for k, v in overrides.items() if v is not None})
             
             updated_count = self.db.update_hotness_scores(
                 topic_ids=topic_ids,
-                view_weight=vw,
-                reply_weight=rw,
-                like_weight=lw,
-                time_decay_hours=tdh,
-                max_score=self.max_hotness_score  # 传递最大分数限制
+                view_weight=weights.view_weight,
+                reply_weight=weights.reply_weight,
+                like_weight=weights.like_weight,
+                time_decay_hours=weights.time_decay_hours,
+                max_score=weights.max_score  # 传递最大分数限制
             )
             
-            self.logger.info(f"成功更新 {updated_count} 个主题的热度分数（最大值限制: {self.max_hotness_score}）")
+            self.invalidate_stats_cache()
+            self.logger.info(f"成功更新 {updated_count} 个主题的热度分数（最大值限制: {weights.max_score}）")
             return updated_count
         except Exception as e:
             self.logger.error(f"更新热度分数失败: {e}")
@@ -98,10 +128,19 @@ class HotnessAnalyzer:
         try:
             self.logger.info(f"开始分析最近 {hours_back} 小时的活跃主题")
             
-            # 获取最近活跃的主题
-            recent_topics = self.db.get_recent_active_topics(hours_back)
-            
-            if not recent_topics:
+            # 在单个事务中完成筛选、点赞数更新和热度分数更新
+            weights = self.weights
+            counts = self.db.analyze_recent_topics(
+                hours_back=hours_back,
+                view_weight=weights.view_weight,
+                reply_weight=weights.reply_weight,
+                like_weight=weights.like_weight,
+                time_decay_hours=weights.time_decay_hours,
+                max_score=weights.max_score
+            )
+            self.invalidate_stats_cache()
+
+            if not counts['analyzed_topics']:
                 self.logger.warning(f"未找到最近 {hours_back} 小时的活跃主题")
                 return {
                     'success': True,
@@ -109,25 +148,16 @@ class HotnessAnalyzer:
                     'updated_likes': 0,
                     'updated_scores': 0
                 }
-            
-            # 提取主题ID
-            topic_ids = [topic['id'] for topic in recent_topics]
-            
-            # 更新总点赞数
-            updated_likes = self.update_total_likes(topic_ids)
-            
-            # 更新热度分数
-            updated_scores = self.update_hotness_scores(topic_ids)
-            
+
             result = {
                 'success': True,
-                'analyzed_topics': len(recent_topics),
-                'updated_likes': updated_likes,
-                'updated_scores': updated_scores,
+                'analyzed_topics': counts['analyzed_topics'],
+                'updated_likes': counts['updated_likes'],
+                'updated_scores': counts['updated_scores'],
                 'analysis_time': self.get_beijing_time()
             }
-            
-            self.logger.info(f"分析完成：{len(recent_topics)} 个主题，更新点赞数 {updated_likes}，更新热度分数 {updated_scores}")
+
+            self.logger.info(f"分析完成：{counts['analyzed_topics']} 个主题，更新点赞数 {counts['updated_likes']}，更新热度分数 {counts['updated_scores']}")
             return result
             
         except Exception as e:
@@ -177,14 +207,26 @@ class HotnessAnalyzer:
     
     def get_hotness_stats(self) -> Dict[str, Any]:
         """
-        获取热度统计信息
+        获取热度统计信息（结果缓存 stats_cache_ttl 秒）
         
         Returns:
             统计信息字典
         """
+        now = time.monotonic()
+        if self._stats_cache is not None and now - self._stats_cache_time < self.stats_cache_ttl:
+            return self._stats_cache
+
+        result = self._query_hotness_stats()
+        if result.get('success'):
+            self._stats_cache = result
+            self._stats_cache_time = now
+        return result
+
+    def _query_hotness_stats(self) -> Dict[str, Any]:
+        """从数据库查询热度统计信息"""
         try:
-            with self.db.get_cursor() as (cursor, connection):
-                # 获取基本统计
+            with self.db.get_ro_cursor() as (cursor, connection):
+                # 一次扫描同时获取基本统计和热度分布
                 cursor.execute("""
                     SELECT 
                         COUNT(*) as total_topics,
@@ -192,31 +234,23 @@ class HotnessAnalyzer:
                         MAX(hotness_score) as max_hotness,
                         MIN(hotness_score) as min_hotness,
                         AVG(total_like_count) as avg_likes,
-                        MAX(total_like_count) as max_likes
+                        MAX(total_like_count) as max_likes,
+                        SUM(CASE WHEN hotness_score >= 1000 THEN 1 ELSE 0 END) as very_hot,
+                        SUM(CASE WHEN hotness_score >= 100 AND hotness_score < 1000 THEN 1 ELSE 0 END) as hot,
+                        SUM(CASE WHEN hotness_score >= 10 AND hotness_score < 100 THEN 1 ELSE 0 END) as warm,
+                        SUM(CASE WHEN hotness_score < 10 THEN 1 ELSE 0 END) as cool
                     FROM topics 
                     WHERE hotness_score > 0
                 """)
                 
                 stats = cursor.fetchone()
                 
-                # 获取热度分布
-                cursor.execute("""
-                    SELECT 
-                        CASE 
-                            WHEN hotness_score >= 1000 THEN 'very_hot'
-                            WHEN hotness_score >= 100 THEN 'hot' 
-                            WHEN hotness_score >= 10 THEN 'warm'
-                            ELSE 'cool'
-                        END as heat_level,
-                        COUNT(*) as count
-                    FROM topics 
-                    WHERE hotness_score > 0
-                    GROUP BY heat_level
-                """)
-                
+                # 热度分布（只保留有主题的等级）
                 heat_distribution = {}
-                for row in cursor.fetchall():
-                    heat_distribution[row['heat_level']] = row['count']
+                for heat_level in ('very_hot', 'hot', 'warm', 'cool'):
+                    count = int(stats.get(heat_level) or 0)
+                    if count:
+                        heat_distribution[heat_level] = count
                 
                 # 获取分类热度排行
                 cursor.execute("""
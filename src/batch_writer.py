@@ -0,0 +1,101 @@
+"""
+批量写入模块
+将多个并发worker产生的数据攒批后统一写入数据库，减少数据库往返次数
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+
+class BatchWriter:
+    """
+    异步批量写入器
+
+    缓冲区达到 max_size 条，或最早一条数据等待超过 max_wait_ms 毫秒时，
+    在线程中调用同步写入函数将缓冲区整体写库。
+    写入失败时不抛出异常，而是把失败批次中各条数据的 tag 记入 failed_tags，
+    由调用方在 drain() 之后据此判断哪些来源的数据没有成功入库。
+    """
+
+    def __init__(self, write_func: Callable[[List[Dict[str, Any]]], Any], name: str,
+                 max_size: int = 500, max_wait_ms: int = 200,
+                 before_flush: Optional[Callable[[], Awaitable[None]]] = None):
+        """
+        Args:
+            write_func: 同步批量写入函数，如 db_manager.batch_insert_posts
+            name: 写入器名称（用于日志）
+            max_size: 缓冲区最大条数，达到后立即写库
+            max_wait_ms: 缓冲数据最长等待时间（毫秒）
+            before_flush: 每次写库前需要先执行的协程函数（如先写入外键依赖的数据）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.write_func = write_func
+        self.name = name
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self.before_flush = before_flush
+
+        self.written_count = 0
+        self.failed_count = 0
+        self.failed_tags: Set[Hashable] = set()
+
+        self._buffer: List[Tuple[Optional[Hashable], Dict[str, Any]]] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, row: Dict[str, Any], tag: Optional[Hashable] = None):
+        """添加单条数据"""
+        await self.add_many([row], tag)
+
+    async def add_many(self, rows: List[Dict[str, Any]], tag: Optional[Hashable] = None):
+        """
+        添加多条数据，缓冲区满时立即写库，否则确保定时写库任务已启动
+
+        Args:
+            rows: 待写入的数据
+            tag: 数据来源标识（如主题URL），所在批次写入失败时记入 failed_tags
+        """
+        if not rows:
+            return
+
+        self._buffer.extend((tag, row) for row in rows)
+        if len(self._buffer) >= self.max_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """等待 max_wait 后写库"""
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """立即将缓冲区中的数据写库"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            if self.before_flush:
+                await self.before_flush()
+
+            entries, self._buffer = self._buffer, []
+            if not entries:
+                return
+
+            rows = [row for _, row in entries]
+            try:
+                await asyncio.to_thread(self.write_func, rows)
+                self.written_count += len(rows)
+            except Exception as e:
+                self.failed_count += len(rows)
+                self.failed_tags.update(tag for tag, _ in entries if tag is not None)
+                self.logger.error(f"批量写入器 [{self.name}] 写入 {len(rows)} 条数据失败: {e}")
+
+    async def drain(self):
+        """写入所有剩余数据（结束前调用）"""
+        await self.flush()
+        self.logger.info(
+            f"批量写入器 [{self.name}] 已清空：成功写入 {self.written_count} 条，失败 {self.failed_count} 条"
+        )
@@ -4,20 +4,66 @@
 """
 import asyncio
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Any, Tuple, Optional
 from datetime import datetime, timezone, timedelta
 import random
+from functools import lru_cache
+
+import orjson
 
 from .config import config
 from .http_client import TLSClient
 from .database import db_manager
 from .proxy_manager import proxy_manager
-from .html_to_markdown import html_to_markdown
+from .html_to_markdown import convert_html_list
+from .batch_writer import BatchWriter
+
+# 北京时区（UTC+8），模块级缓存避免每条记录重复构造
+_BEIJING_TZ = timezone(timedelta(hours=8))
+
+# 有意义帖子的最短长度（字符）
+_MIN_POST_LENGTH = 15
+
+# HTML标签（用于在转换前估算正文长度）
+_TAG_RE = re.compile(r'<[^>]+>')
+# <p>/<br> 以外的HTML标签：含有这类标签的内容转换后可能增加字符（如链接URL、**、列表符号），不做预过滤
+_NON_PLAIN_TAG_RE = re.compile(r'<(?!/?(?:p|br)\b)[^>]*>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 常见的无意义回复（小写，整句匹配）
+_MEANINGLESS_PHRASES = frozenset({
+    'thanks', 'thank you', '感谢分享', '谢谢分享', '学习了',
+    '支持', 'mark', '+1', '插眼', '好人一生平安'
+})
+# 无意义回复的最大长度，超过该长度的内容无需查表
+_MAX_PHRASE_LEN = max(len(phrase) for phrase in _MEANINGLESS_PHRASES)
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso_datetime(time_str: str) -> datetime:
+    """解析ISO格式时间字符串（带缓存，同一时间戳在多页中会重复出现）"""
+    # Python 3.11+ 的 fromisoformat 原生支持 'Z' 后缀，并自动创建时区感知的对象
+    return datetime.fromisoformat(time_str)
+
+
+def _to_bjt_naive(dt: datetime) -> datetime:
+    """将时区感知的时间转换为无时区的北京时间（数据库统一存储格式）"""
+    return dt.astimezone(_BEIJING_TZ).replace(tzinfo=None)
 
 
 class ConcurrentCrawler:
     """并发爬虫"""
     
+    # 主题列表边爬取边入库时每批的最大主题数
+    TOPIC_FLUSH_SIZE = 500
+    
+    # HTML转换进程池的最大进程数（转换量不大，避免在多核机器上启动过多进程）
+    HTML_POOL_MAX_WORKERS = 4
+    
     def __init__(self, max_concurrent_boards=2, max_concurrent_pages=2, max_concurrent_details=5):
         self.crawler_config = config.get_crawler_config()
         self.target_urls = config.get_target_urls()
@@ -28,56 +74,76 @@ class ConcurrentCrawler:
         self.max_concurrent_pages = max_concurrent_pages
         self.max_concurrent_details = max_concurrent_details
         
-        # 信号量控制并发数
-        self.board_semaphore = asyncio.Semaphore(self.max_concurrent_boards)
-        self.page_semaphore = asyncio.Semaphore(self.max_concurrent_pages)
-        self.detail_semaphore = asyncio.Semaphore(self.max_concurrent_details)
+        # 统一的HTTP请求信号量，是列表页面和主题详情请求共用的唯一全局并发上限；
+        # 每个请求从首次发送到重试退避、成功后的随机延迟结束一直持有，避免退避期间其他请求插队加大请求频率。
+        # 流水线模式下列表与详情请求同时进行，共享该上限（取两者中较大的并发数，串行模式下为1）；
+        # 板块数量通常很少，max_concurrent_boards 仅为兼容保留
+        self.http_semaphore = asyncio.BoundedSemaphore(
+            max(self.max_concurrent_pages, self.max_concurrent_details))
+        
+        # HTML转Markdown属于CPU密集型操作，放到进程池中执行，避免阻塞事件循环（爬虫启动时创建）
+        self._html_pool: Optional[ProcessPoolExecutor] = self._create_html_pool()
+    
+    def _create_html_pool(self) -> ProcessPoolExecutor:
+        """
+        创建HTML转换进程池
+        
+        进程中已有数据库连接池、to_thread 等线程，fork 可能复制其他线程持有的锁导致子进程死锁，
+        因此使用 forkserver 启动子进程（平台不支持时使用 spawn）。
+        """
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, self.HTML_POOL_MAX_WORKERS),
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    
+    def _get_html_pool(self) -> ProcessPoolExecutor:
+        """获取HTML转换进程池（已关闭时重新创建）"""
+        if self._html_pool is None:
+            self._html_pool = self._create_html_pool()
+        return self._html_pool
+    
+    def _shutdown_html_pool(self):
+        """关闭HTML转换进程池"""
+        if self._html_pool is not None:
+            self._html_pool.shutdown()
+            self._html_pool = None
     
     def _parse_datetime(self, time_str: str) -> datetime:
         """解析时间字符串为时区感知的datetime对象 (UTC)"""
-        try:
-            if 'T' in time_str:
-                # 确保 'Z' 被替换为 +00:00 以便 fromisoformat 正确解析
-                clean_time = time_str.replace('Z', '+00:00')
-                # fromisoformat 会自动创建时区感知的对象
-                return datetime.fromisoformat(clean_time)
-            # 如果没有时间信息，返回一个时区感知的当前UTC时间
+        # 如果没有时间信息，返回一个时区感知的当前UTC时间
+        if not time_str or 'T' not in time_str:
             return datetime.now(timezone.utc)
-        except Exception as e:
+        try:
+            return _parse_iso_datetime(time_str)
+        except (ValueError, TypeError) as e:
             self.logger.warning(f"时间解析失败: {time_str} - {e}")
             return datetime.now(timezone.utc)
     
     def _get_beijing_time(self):
         """获取北京时间（UTC+8）"""
-        utc_time = datetime.now(timezone.utc)
-        beijing_time = utc_time + timedelta(hours=8)
-        return beijing_time.replace(tzinfo=None)
+        return datetime.now(_BEIJING_TZ).replace(tzinfo=None)
 
-    def _is_meaningful_post(self, content: str, min_length: int = 15) -> bool:
+    def _is_meaningful_post(self, content: str, min_length: int = _MIN_POST_LENGTH) -> bool:
         """
         判断一个帖子内容是否有意义
         - 检查长度
         - 检查是否为常见的无意义回复
         """
-        if not content or not content.strip():
+        content_strip = content.strip() if content else ''
+        if not content_strip:
             return False
 
         # 1. 检查内容长度
-        content_strip = content.strip()
-        if len(content_strip) < min_length:
+        content_length = len(content_strip)
+        if content_length < min_length:
             self.logger.debug(f"过滤短内容: {content_strip}")
             return False
 
-        # 2. 检查常见的无意义回复 (转换为小写以忽略大小写)
-        meaningless_phrases = [
-            'thanks', 'thank you', '感谢分享', '谢谢分享', '学习了',
-            '支持', 'mark', '+1', '插眼', '好人一生平安'
-        ]
-        normalized_content = content_strip.lower()
-        for phrase in meaningless_phrases:
-            if phrase == normalized_content:
-                self.logger.debug(f"过滤无意义回复: {content_strip}")
-                return False
+        # 2. 检查常见的无意义回复 (转换为小写以忽略大小写)，比最长短语还长的内容不可能命中
+        if content_length <= _MAX_PHRASE_LEN and content_strip.lower() in _MEANINGLESS_PHRASES:
+            self.logger.debug(f"过滤无意义回复: {content_strip}")
+            return False
         
         return True
     
@@ -95,8 +161,6 @@ class ConcurrentCrawler:
         
         topic_list = json_data.get('topic_list', {})
         topics_data = topic_list.get('topics', [])
-        users_data = json_data.get('users', [])
-        users_map = {user['id']: user for user in users_data}
         
         for topic_data in topics_data:
             try:
@@ -117,7 +181,6 @@ class ConcurrentCrawler:
                 category_id = topic_data.get('category_id')
                 category = str(category_id) if category_id else 'Unknown'
                 
-                beijing_timezone = timezone(timedelta(hours=8))
                 created_at_utc = self._parse_datetime(topic_data.get('created_at', ''))
                 last_posted_at_utc = self._parse_datetime(topic_data.get('last_posted_at')) if topic_data.get('last_posted_at') else created_at_utc
 
@@ -129,8 +192,8 @@ class ConcurrentCrawler:
                     'author_id': None,
                     'reply_count': topic_data.get('reply_count', 0),
                     'view_count': topic_data.get('views', 0),
-                    'last_activity_at': last_posted_at_utc.astimezone(beijing_timezone).replace(tzinfo=None),
-                    'created_at': created_at_utc.astimezone(beijing_timezone).replace(tzinfo=None),
+                    'last_activity_at': _to_bjt_naive(last_posted_at_utc),
+                    'created_at': _to_bjt_naive(created_at_utc),
                     'tags': tags_str,
                     '_last_activity_at_utc': last_posted_at_utc # 临时存储，用于后续比较
                 }
@@ -145,7 +208,7 @@ class ConcurrentCrawler:
     
     async def _crawl_single_page(self, client: TLSClient, url: str, page_num: int) -> List[Dict[str, Any]]:
         """爬取单个页面，包含重试逻辑。"""
-        async with self.page_semaphore:
+        async with self.http_semaphore:
             json_url = self._build_json_url(url, page_num)
             self.logger.info(f"准备爬取页面: {json_url}")
 
@@ -170,7 +233,7 @@ class ConcurrentCrawler:
                         response = await session.get(json_url, timeout=timeout, headers=headers, proxies=proxies_kw)
 
                         if response.status_code == 200:
-                            json_data = response.json()
+                            json_data = orjson.loads(response.content)
                             topics = self._extract_topics_from_json(json_data, url)
                             self.logger.info(f"页面 {page_num} 成功提取到 {len(topics)} 个主题")
                             # 成功后随机延迟
@@ -194,71 +257,104 @@ class ConcurrentCrawler:
                     retry_delay = (3 ** attempt) + random.uniform(1.0, 3.0)
                     self.logger.info(f"将在 {retry_delay:.2f} 秒后重试...")
                     await asyncio.sleep(retry_delay)
-            
+        
             self.logger.error(f"获取JSON数据最终失败: {json_url}")
             return []
-    
+
     async def _crawl_board_pages(self, client: TLSClient, board_name: str, url: str) -> List[Dict[str, Any]]:
         """并发爬取单个板块的所有页面"""
-        async with self.board_semaphore:
-            self.logger.info(f"开始并发爬取板块: {board_name}")
-            
-            pages = self.crawler_config['scan_pages']
-            
-            # 创建所有页面的爬取任务
-            page_tasks = []
-            for page_num in range(1, pages + 1):
-                task = self._crawl_single_page(client, url, page_num)
-                page_tasks.append(task)
-            
-            # 并发执行所有页面爬取
-            page_results = await asyncio.gather(*page_tasks, return_exceptions=True)
-            
-            # 合并结果
-            all_topics = []
-            for i, result in enumerate(page_results, 1):
-                if isinstance(result, Exception):
-                    self.logger.error(f"板块 {board_name} 页面 {i} 爬取失败: {result}")
-                else:
-                    all_topics.extend(result)
-            
-            self.logger.info(f"板块 {board_name} 总共提取到 {len(all_topics)} 个主题")
-            return all_topics
+        self.logger.info(f"开始并发爬取板块: {board_name}")
+        
+        pages = self.crawler_config['scan_pages']
+        
+        # 并发执行所有页面爬取，单个页面失败不影响同一板块的其他页面
+        page_results = await asyncio.gather(
+            *(self._crawl_single_page(client, url, page_num) for page_num in range(1, pages + 1)),
+            return_exceptions=True
+        )
+        
+        # 合并结果
+        all_topics = []
+        for i, result in enumerate(page_results, 1):
+            if isinstance(result, Exception):
+                self.logger.error(f"板块 {board_name} 页面 {i} 爬取失败: {result}")
+            else:
+                all_topics.extend(result)
+        
+        self.logger.info(f"板块 {board_name} 总共提取到 {len(all_topics)} 个主题")
+        return all_topics
     
     async def crawl_all_topic_lists(self) -> List[str]:
-        """并发爬取所有板块的主题列表"""
+        """并发爬取所有板块的主题列表，每个板块完成后立即分批判断并入库"""
+        topics_to_crawl = []
+        async with TLSClient() as client:
+            await self._crawl_topic_lists(client, topics_to_crawl.extend)
+        
+        self.logger.info(f"需要详细爬取 {len(topics_to_crawl)} 个主题")
+        return topics_to_crawl
+    
+    async def _crawl_topic_lists(self, client: TLSClient,
+                                 on_topics_selected: Callable[[List[str]], None]) -> int:
+        """
+        并发爬取所有板块的主题列表
+        
+        每个板块完成后立即分批在后台线程中判断并入库，与其余板块的爬取重叠进行；
+        每批判断完成后，把需要详细爬取的主题URL交给 on_topics_selected。
+        
+        Returns:
+            提取到的主题总数
+        """
         self.logger.info("开始并发爬取所有板块主题列表")
         
-        async with TLSClient() as client:
-            # 创建所有板块的爬取任务
-            board_tasks = []
-            for board_name, url in self.target_urls.items():
-                task = self._crawl_board_pages(client, board_name, url)
-                board_tasks.append((board_name, task))
-            
-            # 并发执行所有板块爬取
-            board_results = await asyncio.gather(*[task for _, task in board_tasks], return_exceptions=True)
-            
-            # 合并所有主题
-            all_topics = []
-            for i, (board_name, _) in enumerate(board_tasks):
-                result = board_results[i]
-                if isinstance(result, Exception):
-                    self.logger.error(f"板块 {board_name} 爬取失败: {result}")
-                else:
-                    all_topics.extend(result)
-            
-            self.logger.info(f"所有板块总共提取到 {len(all_topics)} 个主题")
+        total_topics = 0
+        save_tasks = []
         
-        # 批量判断哪些主题需要详细爬取
-        if not all_topics:
-            return []
+        async def save_batch(topics: List[Dict[str, Any]]):
+            urls = await asyncio.to_thread(self._select_and_save_topics, topics)
+            if urls:
+                on_topics_selected(urls)
+        
+        # 创建所有板块的爬取任务
+        board_tasks = {
+            asyncio.create_task(self._crawl_board_pages(client, board_name, url)): board_name
+            for board_name, url in self.target_urls.items()
+        }
         
-        topic_ids = [topic['id'] for topic in all_topics]
+        # 按完成顺序处理各板块结果
+        remaining = set(board_tasks)
+        while remaining:
+            done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                board_name = board_tasks[task]
+                if task.exception() is not None:
+                    self.logger.error(f"板块 {board_name} 爬取失败: {task.exception()}")
+                    continue
+                
+                topics = task.result()
+                total_topics += len(topics)
+                for i in range(0, len(topics), self.TOPIC_FLUSH_SIZE):
+                    save_tasks.append(asyncio.create_task(save_batch(topics[i:i + self.TOPIC_FLUSH_SIZE])))
+        
+        self.logger.info(f"所有板块总共提取到 {total_topics} 个主题")
+        
+        # 等待所有批次判断入库完成
+        await asyncio.gather(*save_tasks)
+        return total_topics
+    
+    def _select_and_save_topics(self, topics: List[Dict[str, Any]]) -> List[str]:
+        """
+        判断一批主题中哪些需要详细爬取，然后保存这批主题的基本信息
+        
+        必须先与数据库中的最后活跃时间比较再入库，否则入库会覆盖比较基准。
+        
+        Returns:
+            需要详细爬取的主题URL列表
+        """
+        topic_ids = [topic['id'] for topic in topics]
         db_last_activities = db_manager.get_topics_last_activity_batch(topic_ids)
         
         topics_to_crawl = []
-        for topic_data in all_topics:
+        for topic_data in topics:
             topic_id = topic_data['id']
             db_last_activity = db_last_activities.get(topic_id)
             
@@ -274,8 +370,7 @@ class ConcurrentCrawler:
                     current_last_activity_utc = self._parse_datetime(topic_data.get('last_activity_at', ''))
 
                 # 将新的UTC时间转换为无时区的北京时间，用于比较
-                beijing_timezone = timezone(timedelta(hours=8))
-                current_last_activity_naive_bjt = current_last_activity_utc.astimezone(beijing_timezone).replace(tzinfo=None)
+                current_last_activity_naive_bjt = _to_bjt_naive(current_last_activity_utc)
                 
                 # 现在与数据库中的无时区北京时间进行比较
                 if current_last_activity_naive_bjt > db_last_activity:
@@ -287,119 +382,135 @@ class ConcurrentCrawler:
         
         # 批量保存主题基本信息
         try:
-            db_manager.batch_insert_or_update_topics(all_topics)
-            self.logger.info(f"批量保存 {len(all_topics)} 个主题基本信息成功")
+            db_manager.batch_insert_or_update_topics(topics)
+            self.logger.info(f"批量保存 {len(topics)} 个主题基本信息成功")
         except Exception as e:
             self.logger.error(f"批量保存主题基本信息失败: {e}")
         
-        self.logger.info(f"需要详细爬取 {len(topics_to_crawl)} 个主题")
         return topics_to_crawl
     
     async def _get_json_with_retry(self, client: TLSClient, url: str) -> Optional[Dict[str, Any]]:
         """封装了重试逻辑的JSON获取方法"""
-        max_retries = self.crawler_config.get('max_retries', 3)
-        for attempt in range(max_retries + 1):
-            current_proxy = None
-            try:
-                async with client.get_session() as session:
-                    self.logger.debug(f"请求URL: {url} (尝试 {attempt + 1}/{max_retries + 1})")
-                    timeout = self.crawler_config.get('timeout_seconds', 30)
-                    headers = {
-                        "accept": "application/json, text/javascript, */*; q=0.01",
-                        "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
-                        "x-requested-with": "XMLHttpRequest",
-                        "referer": "https://linux.do/"
-                    }
+        async with self.http_semaphore:
+            max_retries = self.crawler_config.get('max_retries', 3)
+            for attempt in range(max_retries + 1):
+                current_proxy = None
+                try:
+                    async with client.get_session() as session:
+                        self.logger.debug(f"请求URL: {url} (尝试 {attempt + 1}/{max_retries + 1})")
+                        timeout = self.crawler_config.get('timeout_seconds', 30)
+                        headers = {
+                            "accept": "application/json, text/javascript, */*; q=0.01",
+                            "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
+                            "x-requested-with": "XMLHttpRequest",
+                            "referer": "https://linux.do/"
+                        }
 
-                    current_proxy = await proxy_manager.get_proxy()
-                    proxies_kw = {"all": current_proxy} if current_proxy else None
+                        current_proxy = await proxy_manager.get_proxy()
+                        proxies_kw = {"all": current_proxy} if current_proxy else None
 
-                    response = await session.get(url, timeout=timeout, headers=headers, proxies=proxies_kw)
-                    if response.status_code == 200:
-                        return response.json()
-                    self.logger.warning(f"请求失败 (尝试 {attempt + 1}): {url} - 状态码: {response.status_code}")
+                        response = await session.get(url, timeout=timeout, headers=headers, proxies=proxies_kw)
+                        if response.status_code == 200:
+                            return orjson.loads(response.content)
+                        self.logger.warning(f"请求失败 (尝试 {attempt + 1}): {url} - 状态码: {response.status_code}")
 
-                    if response.status_code in (429, 403):
-                        if current_proxy:
-                            proxy_manager.remove_proxy(current_proxy)
-                            self.logger.info("遭遇封锁，踢出当前代理，准备下一次重试...")
-            except Exception as e:
-                self.logger.warning(f"请求异常 (尝试 {attempt + 1}): {url} - {e}")
-                if current_proxy:
-                    proxy_manager.remove_proxy(current_proxy)
-                    self.logger.info("请求异常，踢出当前代理，准备下一次重试...")
+                        if response.status_code in (429, 403):
+                            if current_proxy:
+                                proxy_manager.remove_proxy(current_proxy)
+                                self.logger.info("遭遇封锁，踢出当前代理，准备下一次重试...")
+                except Exception as e:
+                    self.logger.warning(f"请求异常 (尝试 {attempt + 1}): {url} - {e}")
+                    if current_proxy:
+                        proxy_manager.remove_proxy(current_proxy)
+                        self.logger.info("请求异常，踢出当前代理，准备下一次重试...")
 
-            if attempt < max_retries:
-                retry_delay = (3 ** attempt) + random.uniform(1.0, 3.0)
-                await asyncio.sleep(retry_delay)
+                if attempt < max_retries:
+                    retry_delay = (3 ** attempt) + random.uniform(1.0, 3.0)
+                    await asyncio.sleep(retry_delay)
 
-        self.logger.error(f"请求JSON最终失败: {url}")
-        return None
+            self.logger.error(f"请求JSON最终失败: {url}")
+            return None
 
-    async def _crawl_single_topic_detail(self, client: TLSClient, topic_url: str) -> bool:
-        """使用独立的页面实例爬取单个主题详情，包含分页和重试。"""
-        async with self.detail_semaphore:
-            base_json_url = topic_url.replace('/t/', '/t/').rstrip('/') + '.json'
-            self.logger.info(f"开始爬取主题详情: {topic_url}")
+    async def _crawl_single_topic_detail(self, client: TLSClient, topic_url: str,
+                                         user_writer: Optional[BatchWriter] = None,
+                                         topic_writer: Optional[BatchWriter] = None,
+                                         post_writer: Optional[BatchWriter] = None) -> bool:
+        """
+        使用独立的页面实例爬取单个主题详情，包含分页和重试。
+        
+        提供 user_writer / topic_writer / post_writer 时，用户、主题和回复以 topic_url 为标记
+        交给批量写入器攒批入库（返回 True 仅表示已成功入队，是否写库成功由 _finish_detail_crawl 判断）；
+        否则在本主题内直接写库。
+        """
+        base_json_url = topic_url.replace('/t/', '/t/').rstrip('/') + '.json'
+        self.logger.info(f"开始爬取主题详情: {topic_url}")
 
-            try:
-                # 获取第一页数据
-                json_data = await self._get_json_with_retry(client, base_json_url)
-                if not json_data:
-                    return False
+        try:
+            # 获取第一页数据
+            json_data = await self._get_json_with_retry(client, base_json_url)
+            if not json_data:
+                return False
 
-                topic_id = json_data.get('id')
-                if not topic_id:
-                    self.logger.warning(f"无法从 {base_json_url} 中获取 topic_id")
-                    return False
+            topic_id = json_data.get('id')
+            if not topic_id:
+                self.logger.warning(f"无法从 {base_json_url} 中获取 topic_id")
+                return False
 
-                all_users = self._extract_users_from_json(json_data)
-                all_posts = self._extract_posts_from_json(json_data, topic_id)
-                
-                # 检查是否需要分页
-                post_stream = json_data.get('post_stream', {})
-                posts_in_stream = post_stream.get('posts', [])
-                total_posts_count = json_data.get('posts_count', len(posts_in_stream))
-
-                if posts_in_stream and len(posts_in_stream) < total_posts_count:
-                    posts_per_page = len(posts_in_stream)
-                    total_pages = (total_posts_count + posts_per_page - 1) // posts_per_page
-                    self.logger.info(f"主题 {topic_id} 有 {total_posts_count} 个回复，共 {total_pages} 页，将进行分页爬取。")
-
-                    for page_num in range(2, total_pages + 1):
-                        page_url = f"{base_json_url}?page={page_num}"
-                        page_data = await self._get_json_with_retry(client, page_url)
-                        if page_data:
-                            all_users.extend(self._extract_users_from_json(page_data))
-                            all_posts.extend(self._extract_posts_from_json(page_data, topic_id))
-                            self.logger.debug(f"第 {page_num} 页获取成功")
-                        else:
-                            self.logger.warning(f"第 {page_num} 页数据获取失败")
-                        await asyncio.sleep(random.uniform(0.5, 1.0))
+            all_users = self._extract_users_from_json(json_data)
+            all_posts = await self._extract_posts_from_json(json_data, topic_id)
+            
+            # 检查是否需要分页
+            post_stream = json_data.get('post_stream', {})
+            posts_in_stream = post_stream.get('posts', [])
+            total_posts_count = json_data.get('posts_count', len(posts_in_stream))
+
+            if posts_in_stream and len(posts_in_stream) < total_posts_count:
+                posts_per_page = len(posts_in_stream)
+                total_pages = (total_posts_count + posts_per_page - 1) // posts_per_page
+                self.logger.info(f"主题 {topic_id} 有 {total_posts_count} 个回复，共 {total_pages} 页，将进行分页爬取。")
+
+                for page_num in range(2, total_pages + 1):
+                    page_url = f"{base_json_url}?page={page_num}"
+                    page_data = await self._get_json_with_retry(client, page_url)
+                    if page_data:
+                        all_users.update(self._extract_users_from_json(page_data))
+                        all_posts.extend(await self._extract_posts_from_json(page_data, topic_id))
+                        self.logger.debug(f"第 {page_num} 页获取成功")
+                    else:
+                        self.logger.warning(f"第 {page_num} 页数据获取失败")
+                    await asyncio.sleep(random.uniform(0.5, 1.0))
+
+            # 数据处理与入库（同步数据库写入放到线程中执行，避免阻塞事件循环上的其他请求）
+            if all_users:
+                unique_users = list(all_users.values())
+                if user_writer:
+                    await user_writer.add_many(unique_users, topic_url)
+                else:
+                    await asyncio.to_thread(db_manager.batch_insert_users, unique_users)
+            
+            topic_info = self._extract_topic_info_from_json(json_data)
+            if topic_info:
+                if topic_writer:
+                    await topic_writer.add(topic_info, topic_url)
+                else:
+                    await asyncio.to_thread(db_manager.insert_or_update_topic, topic_info)
+            
+            if all_posts:
+                if post_writer:
+                    await post_writer.add_many(all_posts, topic_url)
+                else:
+                    await asyncio.to_thread(db_manager.batch_insert_posts, all_posts)
 
-                # 数据处理与入库
-                if all_users:
-                    unique_users = {user['id']: user for user in all_users if user.get('id')}
-                    db_manager.batch_insert_users(list(unique_users.values()))
-                
-                topic_info = self._extract_topic_info_from_json(json_data)
-                if topic_info:
-                    db_manager.insert_or_update_topic(topic_info)
-                
-                if all_posts:
-                    db_manager.batch_insert_posts(all_posts)
+            self.logger.info(f"主题详情爬取成功: {topic_url}")
+            await asyncio.sleep(random.uniform(1.0, 2.0))
+            return True
 
-                self.logger.info(f"主题详情爬取成功: {topic_url}")
-                await asyncio.sleep(random.uniform(1.0, 2.0))
-                return True
+        except Exception as e:
+            self.logger.error(f"爬取主题详情时发生严重错误: {topic_url} - {e}", exc_info=True)
+            return False
 
-            except Exception as e:
-                self.logger.error(f"爬取主题详情时发生严重错误: {topic_url} - {e}", exc_info=True)
-                return False
-    
-    def _extract_users_from_json(self, json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """从JSON数据中提取用户信息"""
-        users = []
+    def _extract_users_from_json(self, json_data: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """从JSON数据中提取用户信息，返回以用户ID为键的去重字典"""
         unique_users = {}
         
         if 'details' in json_data and 'participants' in json_data['details']:
@@ -414,7 +525,7 @@ class ConcurrentCrawler:
         
         if 'post_stream' in json_data and 'posts' in json_data['post_stream']:
             for post in json_data['post_stream']['posts']:
-                if 'user_id' in post and 'username' in post:
+                if post.get('user_id') and 'username' in post:
                     user_info = {
                         'id': post['user_id'],
                         'username': post['username'],
@@ -422,12 +533,11 @@ class ConcurrentCrawler:
                     }
                     unique_users[user_info['id']] = user_info
         
-        return list(unique_users.values())
+        return unique_users
     
     def _extract_topic_info_from_json(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
         """从JSON数据中提取主题信息"""
         try:
-            beijing_timezone = timezone(timedelta(hours=8))
             created_at_utc = self._parse_datetime(json_data.get('created_at', ''))
             last_activity_at_utc = self._parse_datetime(json_data.get('last_posted_at', ''))
 
@@ -439,8 +549,8 @@ class ConcurrentCrawler:
                 'author_id': None,
                 'reply_count': json_data.get('reply_count', 0),
                 'view_count': json_data.get('views', 0),
-                'created_at': created_at_utc.astimezone(beijing_timezone).replace(tzinfo=None),
-                'last_activity_at': last_activity_at_utc.astimezone(beijing_timezone).replace(tzinfo=None),
+                'created_at': _to_bjt_naive(created_at_utc),
+                'last_activity_at': _to_bjt_naive(last_activity_at_utc),
                 'tags': ','.join(json_data.get('tags', []))
             }
             
@@ -456,20 +566,47 @@ class ConcurrentCrawler:
             self.logger.error(f"解析主题信息失败: {e}")
             return None
     
-    def _extract_posts_from_json(self, json_data: Dict[str, Any], topic_id: int) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _max_plain_post_length(html_content: str) -> float:
+        """
+        估算只含 <p>/<br> 标签的回复转换为Markdown后的最大长度，用于在转换前跳过必然过短的回复
+
+        与转换器一致先合并空白，再把每个标签按最多两个换行计算，结果不小于实际转换后的长度。
+        含其他标签或HTML实体（实体解码后可能变成标签）的内容无法可靠估算，返回无穷大。
+        """
+        if '&' in html_content or _NON_PLAIN_TAG_RE.search(html_content):
+            return float('inf')
+        return len(_TAG_RE.sub('\n\n', _WHITESPACE_RE.sub(' ', html_content)).strip())
+
+    async def _extract_posts_from_json(self, json_data: Dict[str, Any], topic_id: int) -> List[Dict[str, Any]]:
         """从JSON数据中提取帖子和回复信息"""
         posts = []
         
         if 'post_stream' not in json_data or 'posts' not in json_data['post_stream']:
             return posts
         
-        for post_data in json_data['post_stream']['posts']:
+        posts_data = json_data['post_stream']['posts']
+        
+        # 从 'cooked' 字段获取HTML内容；转换后必然过短而被过滤的回复（如"+1"）直接跳过转换
+        kept_posts = []
+        cooked_list = []
+        for post_data in posts_data:
+            html_content = post_data.get('cooked') or ''
+            if self._max_plain_post_length(html_content) < _MIN_POST_LENGTH:
+                self.logger.debug(f"过滤短内容帖子: Post ID {post_data.get('id')}")
+                continue
+            kept_posts.append(post_data)
+            cooked_list.append(html_content)
+        
+        if not kept_posts:
+            return posts
+        
+        # 整页一次性在进程池中转换为Markdown
+        loop = asyncio.get_running_loop()
+        markdown_list = await loop.run_in_executor(self._get_html_pool(), convert_html_list, cooked_list)
+        
+        for post_data, markdown_content in zip(kept_posts, markdown_list):
             try:
-                # 从 'cooked' 字段获取HTML内容并转换为Markdown
-                html_content = post_data.get('cooked', '')
-                # 将HTML转换为Markdown
-                markdown_content = html_to_markdown.convert(html_content)
-
                 # 过滤无意义的帖子
                 if not self._is_meaningful_post(markdown_content):
                     self.logger.debug(f"过滤无意义帖子: Post ID {post_data.get('id')}")
@@ -482,7 +619,6 @@ class ConcurrentCrawler:
                     if first_action.get('id') == 2:
                         like_count = first_action.get('count', 0)
                 
-                beijing_timezone = timezone(timedelta(hours=8))
                 created_at_utc = self._parse_datetime(post_data.get('created_at', ''))
 
                 post_info = {
@@ -493,7 +629,7 @@ class ConcurrentCrawler:
                     'reply_to_post_number': post_data.get('reply_to_post_number'),
                     'content_raw': markdown_content,
                     'like_count': like_count,
-                    'created_at': created_at_utc.astimezone(beijing_timezone).replace(tzinfo=None)
+                    'created_at': _to_bjt_naive(created_at_utc)
                 }
                 
                 if post_info['id'] and post_info['post_number']:
@@ -505,62 +641,107 @@ class ConcurrentCrawler:
         
         return posts
     
-    async def _topic_detail_worker(self, name: str, client: TLSClient, queue: asyncio.Queue, results: list):
-        """消费者worker，从队列中获取URL并执行爬取"""
-        while True:
-            try:
-                topic_url = await queue.get()
-                self.logger.info(f"Worker [{name}] 开始处理: {topic_url} (队列剩余: {queue.qsize()})")
+    def _create_batch_writers(self) -> Tuple[BatchWriter, BatchWriter, BatchWriter]:
+        """
+        创建详情爬取共享的用户/主题/回复批量写入器
 
-                is_success = await self._crawl_single_topic_detail(client, topic_url)
-                if is_success:
-                    results.append(topic_url)
+        按外键依赖串联：主题写库前先写入用户（作者），回复写库前先写入主题（进而写入用户）
+        """
+        user_writer = BatchWriter(db_manager.batch_insert_users, name='users')
+        topic_writer = BatchWriter(db_manager.batch_upsert_topic_details, name='topics',
+                                   before_flush=user_writer.flush)
+        post_writer = BatchWriter(db_manager.batch_insert_posts, name='posts',
+                                  before_flush=topic_writer.flush)
+        return user_writer, topic_writer, post_writer
+
+    async def _finish_detail_crawl(self, topic_urls: List[str], results: List[Any],
+                                   user_writer: BatchWriter, topic_writer: BatchWriter,
+                                   post_writer: BatchWriter) -> int:
+        """
+        详情爬取收尾：关闭进程池、写入剩余数据并统计结果，返回成功数
 
-                queue.task_done()
-                self.logger.info(f"Worker [{name}] 完成处理: {topic_url}")
+        数据所在批次写库失败的主题（用户、主题或回复任一写入失败）计为失败。
+        """
+        self._shutdown_html_pool()
+
+        # 写入批量写入器中剩余的数据
+        await post_writer.drain()
+        await topic_writer.drain()
+        await user_writer.drain()
+
+        write_failed_urls = user_writer.failed_tags | topic_writer.failed_tags | post_writer.failed_tags
+
+        success_count = 0
+        for topic_url, result in zip(topic_urls, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"主题详情爬取时发生严重错误: {topic_url} - {result}")
+            elif result is True:
+                if topic_url in write_failed_urls:
+                    self.logger.error(f"主题详情数据写库失败: {topic_url}")
+                else:
+                    success_count += 1
 
-            except asyncio.CancelledError:
-                self.logger.debug(f"Worker [{name}] 被取消")
-                break
-            except Exception as e:
-                self.logger.error(f"Worker [{name}] 处理时发生严重错误: {e}", exc_info=True)
-                # 即使出错，也要标记任务完成，避免队列阻塞
-                queue.task_done()
+        return success_count
 
     async def crawl_topics_details_concurrent(self, topic_urls: List[str]) -> Tuple[int, int]:
-        """使用生产者-消费者模式并发爬取主题详情"""
+        """并发爬取主题详情（URL列表已知，直接以信号量限制并发后统一gather）"""
         if not topic_urls:
             return 0, 0
 
         total_count = len(topic_urls)
-        self.logger.info(f"启动生产者-消费者模式，并发爬取 {total_count} 个主题详情")
-        
-        results = []
-        queue = asyncio.Queue()
-        for url in topic_urls:
-            queue.put_nowait(url)
+        self.logger.info(f"开始并发爬取 {total_count} 个主题详情，并发数: {self.max_concurrent_details}")
+
+        user_writer, topic_writer, post_writer = self._create_batch_writers()
+        detail_semaphore = asyncio.Semaphore(self.max_concurrent_details)
 
         async with TLSClient() as client:
-            # 创建并启动消费者worker
-            num_workers = self.max_concurrent_details
-            workers = [
-                asyncio.create_task(self._topic_detail_worker(f"worker-{i+1}", client, queue, results))
-                for i in range(num_workers)
-            ]
-            self.logger.info(f"已启动 {num_workers} 个消费者worker")
-
-            # 等待队列中的所有任务被处理
-            await queue.join()
-            self.logger.info("所有主题已处理完毕，队列为空")
-
-            # 所有任务完成后，取消worker
-            for worker in workers:
-                worker.cancel()
-            
-            await asyncio.gather(*workers, return_exceptions=True)
-            self.logger.info("所有worker已安全停止")
+            async def crawl_one(topic_url: str) -> bool:
+                async with detail_semaphore:
+                    return await self._crawl_single_topic_detail(client, topic_url, user_writer, topic_writer, post_writer)
 
-        success_count = len(results)
+            results = await asyncio.gather(*(crawl_one(url) for url in topic_urls), return_exceptions=True)
+
+        success_count = await self._finish_detail_crawl(topic_urls, results, user_writer, topic_writer, post_writer)
         self.logger.info(f"并发爬取完成: 成功 {success_count}/{total_count}")
         return success_count, total_count
 
+    async def crawl_topics_pipelined(self) -> Tuple[int, int]:
+        """
+        流水线方式爬取：主题列表与主题详情同时进行
+        
+        每批主题完成判断入库后，立即开始爬取其中需要更新的主题详情，
+        不必等待所有板块的列表爬取完成。
+        
+        Returns:
+            (详情爬取成功数, 需要详细爬取的主题数)
+        """
+        user_writer, topic_writer, post_writer = self._create_batch_writers()
+        detail_semaphore = asyncio.Semaphore(self.max_concurrent_details)
+        topic_urls = []
+        detail_tasks = []
+
+        async with TLSClient() as client:
+            async def crawl_one(topic_url: str) -> bool:
+                async with detail_semaphore:
+                    return await self._crawl_single_topic_detail(client, topic_url, user_writer, topic_writer, post_writer)
+
+            def start_details(urls: List[str]):
+                topic_urls.extend(urls)
+                detail_tasks.extend(asyncio.create_task(crawl_one(url)) for url in urls)
+                self.logger.info(f"新增 {len(urls)} 个主题进入详情爬取（累计 {len(topic_urls)} 个）")
+
+            try:
+                await self._crawl_topic_lists(client, start_details)
+            except BaseException:
+                # 列表阶段失败时取消已开始的详情任务，避免其在客户端关闭后继续运行
+                for task in detail_tasks:
+                    task.cancel()
+                await asyncio.gather(*detail_tasks, return_exceptions=True)
+                self._shutdown_html_pool()
+                raise
+            results = await asyncio.gather(*detail_tasks, return_exceptions=True)
+
+        total_count = len(topic_urls)
+        success_count = await self._finish_detail_crawl(topic_urls, results, user_writer, topic_writer, post_writer)
+        self.logger.info(f"流水线爬取完成: 详情成功 {success_count}/{total_count}")
+        return success_count, total_count
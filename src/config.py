@@ -1,5 +1,6 @@
 import os
 import configparser
+from functools import cache
 from typing import Dict, Any, List
 from dotenv import load_dotenv
 
@@ -7,6 +8,9 @@ class Config:
     """
     配置加载器，负责从环境变量、config.ini文件和默认值中读取配置。
     优先级：环境变量 > config.ini配置 > 默认值
+    
+    配置在进程启动后不再变化，各 get_* 方法的结果只计算一次并缓存，
+    返回的字典为共享对象，调用方不应修改。
     """
     def __init__(self):
         # 在本地开发环境中，可以加载.env文件
@@ -59,6 +63,7 @@ class Config:
         # 3. 返回默认值
         return default_value
 
+    @cache
     def get_database_config(self) -> Dict[str, Any]:
         """获取数据库配置，优先级：环境变量 > config.ini > 默认值。"""
         config = {
@@ -67,12 +72,14 @@ class Config:
             'password': self._get_config_value('database', 'password', 'DB_PASSWORD', None),
             'database': self._get_config_value('database', 'database', 'DB_NAME', None),
             'port': self._get_config_value('database', 'port', 'DB_PORT', 3306, int),
-            'ssl_mode': self._get_config_value('database', 'ssl_mode', 'DB_SSL_MODE', 'disabled')
+            'ssl_mode': self._get_config_value('database', 'ssl_mode', 'DB_SSL_MODE', 'disabled'),
+            'pool_max_connections': self._get_config_value('database', 'pool_max_connections', 'DB_POOL_MAX_CONNECTIONS', 10, int)
         }
         if not all([config['host'], config['user'], config['password'], config['database']]):
             raise ValueError("数据库核心配置 (host, user, password, database) 必须在环境变量或config.ini中设置。")
         return config
 
+    @cache
     def get_crawler_config(self) -> Dict[str, Any]:
         """获取爬虫配置，优先级：环境变量 > config.ini > 默认值。"""
         return {
@@ -91,10 +98,12 @@ class Config:
             'proxy': self._get_config_value('crawler', 'proxy', 'CRAWLER_PROXY', None, str)
         }
 
+    @cache
     def get_data_retention_days(self) -> int:
         """获取数据保留天数，优先级：环境变量 > config.ini > 默认值。"""
         return self._get_config_value('data_retention', 'days', 'DATA_RETENTION_DAYS', 120, int)
 
+    @cache
     def get_logging_config(self) -> Dict[str, str]:
         """获取日志配置，优先级：环境变量 > config.ini > 默认值。"""
         return {
@@ -102,6 +111,7 @@ class Config:
             'log_file': self._get_config_value('logging', 'log_file', 'LOGGING_LOG_FILE', 'crawler.log')
         }
 
+    @cache
     def get_target_urls(self) -> Dict[str, str]:
         """
         获取目标板块URL，优先级：环境变量 > config.ini > 默认值。
@@ -177,6 +187,7 @@ class Config:
         
         return targets
     
+    @cache
     def get_llm_config(self) -> Dict[str, Any]:
         """获取LLM配置，支持逗号分隔的模型列表。"""
         api_key = self._get_config_value('llm', 'openai_api_key', 'OPENAI_API_KEY', None)
@@ -212,6 +223,7 @@ class Config:
             'priority_model': secondary_model
         }
 
+    @cache
     def get_report_config(self) -> Dict[str, Any]:
         """获取报告生成配置，优先级：环境变量 > config.ini > 默认值。"""
         return {
@@ -228,6 +240,7 @@ class Config:
             'light_report_content_quality_weight': self._get_config_value('report', 'light_report_content_quality_weight', 'LIGHT_REPORT_CONTENT_QUALITY_WEIGHT', 0.1, float)
         }
 
+    @cache
     def get_notion_config(self) -> Dict[str, Any]:
         """获取Notion配置，优先级：环境变量 > config.ini > 默认值。"""
         return {
@@ -3,37 +3,131 @@
 负责管理数据库存储空间，清理过期数据
 """
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 
 from .config import config
-from .database import db_manager
+from .database import db_manager, _placeholders
+
+# 北京时区（UTC+8），模块级缓存避免每次调用重复构造
+_BEIJING_TZ = timezone(timedelta(hours=8))
 
 
 class DataCleaner:
     """数据清理器"""
     
-    def __init__(self):
+    # 精确计数：InnoDB 没有行数计数器，COUNT(*) 需要扫描整个索引
+    EXACT_COUNT_SQL = "(SELECT COUNT(*) FROM {table})"
+    # 估算计数：information_schema 中 InnoDB 维护的估算行数（误差约±5%，且有统计缓存延迟）
+    APPROXIMATE_COUNT_SQL = ("(SELECT TABLE_ROWS FROM information_schema.TABLES "
+                             "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}')")
+    
+    # 孤立数据清理时每批处理的最大行数
+    ORPHAN_BATCH_SIZE = 5000
+    
+    # 孤立数据清理步骤：(结果字段, 查询孤立行ID的语句, 按ID处理的语句)
+    # 使用 LEFT JOIN 反连接查找孤立行；处理语句中重新校验孤立条件
+    ORPHAN_CLEANUP_STEPS = (
+        # 清理没有关联主题的回复（理论上不应该存在，因为有外键约束）
+        (
+            'orphaned_posts_deleted',
+            """
+            SELECT p.id FROM posts p
+            LEFT JOIN topics t ON p.topic_id = t.id
+            WHERE t.id IS NULL
+            """,
+            """
+            DELETE FROM posts
+            WHERE id IN ({placeholders})
+              AND NOT EXISTS (SELECT 1 FROM topics t WHERE t.id = posts.topic_id)
+            """
+        ),
+        # 清理没有关联用户的数据（设置为NULL，不删除）
+        (
+            'orphaned_topic_authors_fixed',
+            """
+            SELECT t.id FROM topics t
+            LEFT JOIN users u ON t.author_id = u.id
+            WHERE t.author_id IS NOT NULL AND u.id IS NULL
+            """,
+            """
+            UPDATE topics SET author_id = NULL
+            WHERE id IN ({placeholders})
+              AND NOT EXISTS (SELECT 1 FROM users u WHERE u.id = topics.author_id)
+            """
+        ),
+        (
+            'orphaned_post_authors_fixed',
+            """
+            SELECT p.id FROM posts p
+            LEFT JOIN users u ON p.user_id = u.id
+            WHERE p.user_id IS NOT NULL AND u.id IS NULL
+            """,
+            """
+            UPDATE posts SET user_id = NULL
+            WHERE id IN ({placeholders})
+              AND NOT EXISTS (SELECT 1 FROM users u WHERE u.id = posts.user_id)
+            """
+        ),
+    )
+    
+    def __init__(self, use_approximate_counts: bool = True, cache_ttl_seconds: float = 30,
+                 parallel_orphan_cleanup: bool = True):
         self.retention_days = config.get_data_retention_days()
+        self.use_approximate_counts = use_approximate_counts
+        self.parallel_orphan_cleanup = parallel_orphan_cleanup
+        self.cache_ttl_seconds = cache_ttl_seconds
         self.logger = logging.getLogger(__name__)
+        
+        # 统计信息缓存：是否精确统计 -> (缓存时间, 缓存时的数据变更计数, 统计结果)
+        self._stats_cache: Dict[bool, Tuple[float, int, Dict[str, Any]]] = {}
     
     def _get_beijing_time(self):
         """获取北京时间（UTC+8）"""
-        utc_time = datetime.now(timezone.utc)
-        beijing_time = utc_time + timedelta(hours=8)
-        return beijing_time.replace(tzinfo=None)
+        return datetime.now(_BEIJING_TZ).replace(tzinfo=None)
+    
+    def _run_exclusive(self, lock_name: str, func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        持有数据库命名锁执行清理任务，防止多个进程同时执行同一清理任务
+        
+        锁已被其他进程持有时直接跳过，返回 skipped='already_running'
+        """
+        try:
+            with db_manager.advisory_lock(lock_name) as acquired:
+                if not acquired:
+                    self.logger.warning("清理任务 %s 正在其他进程中执行，跳过", lock_name)
+                    return {
+                        'success': False,
+                        'skipped': 'already_running',
+                        'error': f"清理任务 {lock_name} 正在其他进程中执行"
+                    }
+                return func()
+        except Exception as e:
+            self.logger.error("执行清理任务 %s 失败: %s", lock_name, e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
     
     def clean_expired_data(self, retention_days: int = None) -> Dict[str, Any]:
-        """清理过期数据"""
+        """清理过期数据（同一时间只允许一个进程执行）"""
         if retention_days is None:
             retention_days = self.retention_days
-        
-        self.logger.info(f"开始清理 {retention_days} 天前的数据")
+        return self._run_exclusive('data_cleaner:clean_expired',
+                                   lambda: self._clean_expired_data(retention_days))
+    
+    def _clean_expired_data(self, retention_days: int) -> Dict[str, Any]:
+        """清理过期数据"""
+        self.logger.info("开始清理 %d 天前的数据", retention_days)
         start_time = self._get_beijing_time()
+        # 截止时间在 Python 中算好后作为常量参数传入，保证按 last_activity_at 索引范围扫描
+        cutoff_ts = start_time - timedelta(days=retention_days)
         
         try:
             # 清理过期主题及其相关数据
-            deleted_count = db_manager.clean_old_data(retention_days)
+            deleted_count = db_manager.clean_old_data(cutoff_ts)
             
             end_time = self._get_beijing_time()
             duration = (end_time - start_time).total_seconds()
@@ -42,16 +136,17 @@ class DataCleaner:
                 'success': True,
                 'deleted_topics': deleted_count,
                 'retention_days': retention_days,
+                'cutoff_time': cutoff_ts,
                 'start_time': start_time,
                 'end_time': end_time,
                 'duration_seconds': duration
             }
             
-            self.logger.info(f"数据清理完成: 删除了 {deleted_count} 个过期主题，耗时 {duration:.2f} 秒")
+            self.logger.info("数据清理完成: 删除了 %d 个过期主题，耗时 %.2f 秒", deleted_count, duration)
             return result
             
         except Exception as e:
-            self.logger.error(f"数据清理失败: {e}")
+            self.logger.error("数据清理失败: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -60,99 +155,156 @@ class DataCleaner:
                 'end_time': self._get_beijing_time()
             }
     
-    def get_database_stats(self) -> Dict[str, Any]:
-        """获取数据库统计信息"""
+    def get_database_stats(self, exact: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        获取数据库统计信息
+        
+        结果在进程内缓存：本进程没有写入过数据（db_manager.mutation_count 未变化）且未超过
+        cache_ttl_seconds 秒时直接返回缓存结果；其他进程的写入只能依靠过期时间感知
+        
+        Args:
+            exact: 是否使用 COUNT(*) 精确统计用户/主题/回复数量，
+                   None 时按 use_approximate_counts 决定（默认使用估算行数）
+        """
+        if exact is None:
+            exact = not self.use_approximate_counts
+        
+        mutation_count = db_manager.mutation_count
+        cached = self._stats_cache.get(exact)
+        if (cached and cached[1] == mutation_count
+                and time.monotonic() - cached[0] < self.cache_ttl_seconds):
+            return dict(cached[2])
+        
+        count_sql = self.EXACT_COUNT_SQL if exact else self.APPROXIMATE_COUNT_SQL
+        
         try:
-            with db_manager.get_cursor() as (cursor, connection):
-                stats = {}
-                
-                # 统计用户数量
-                cursor.execute("SELECT COUNT(*) as count FROM users")
-                stats['users_count'] = cursor.fetchone()['count']
-                
-                # 统计主题数量
-                cursor.execute("SELECT COUNT(*) as count FROM topics")
-                stats['topics_count'] = cursor.fetchone()['count']
-                
-                # 统计回复数量
-                cursor.execute("SELECT COUNT(*) as count FROM posts")
-                stats['posts_count'] = cursor.fetchone()['count']
-                
-                # 统计最新数据时间
-                cursor.execute("SELECT MAX(last_activity_at) as latest FROM topics")
-                result = cursor.fetchone()
-                stats['latest_activity'] = result['latest'] if result['latest'] else None
-                
-                # 统计最旧数据时间
-                cursor.execute("SELECT MIN(last_activity_at) as oldest FROM topics")
-                result = cursor.fetchone()
-                stats['oldest_activity'] = result['oldest'] if result['oldest'] else None
+            # 今天的起止时间（北京时间），使用范围条件以便走 last_activity_at 索引
+            today_start = self._get_beijing_time().replace(hour=0, minute=0, second=0, microsecond=0)
+            today_end = today_start + timedelta(days=1)
+            
+            with db_manager.get_tuple_cursor(readonly=True) as (cursor, connection):
+                # 一次往返获取用户/主题/回复数量、最新/最旧活跃时间和今天的数据量
+                cursor.execute(f"""
+                    SELECT
+                        {count_sql.format(table='users')} as users_count,
+                        {count_sql.format(table='topics')} as topics_count,
+                        {count_sql.format(table='posts')} as posts_count,
+                        (SELECT MAX(last_activity_at) FROM topics) as latest,
+                        (SELECT MIN(last_activity_at) FROM topics) as oldest,
+                        (SELECT COUNT(*) FROM topics
+                         WHERE last_activity_at >= %s AND last_activity_at < %s) as today_topics
+                """, (today_start, today_end))
+                (users_count, topics_count, posts_count,
+                 latest, oldest, today_topics) = cursor.fetchone()
                 
-                # 统计今天的数据量（使用北京时间）
-                cursor.execute("""
-                    SELECT COUNT(*) as count FROM topics 
-                    WHERE DATE(last_activity_at) = DATE(CURRENT_TIMESTAMP + INTERVAL 8 HOUR)
-                """)
-                stats['today_topics'] = cursor.fetchone()['count']
+                stats = {
+                    'users_count': users_count or 0,
+                    'topics_count': topics_count or 0,
+                    'posts_count': posts_count or 0,
+                    'latest_activity': latest if latest else None,
+                    'oldest_activity': oldest if oldest else None,
+                    'today_topics': today_topics,
+                    'counts_approximate': not exact
+                }
                 
-                return stats
+                self._stats_cache[exact] = (time.monotonic(), mutation_count, stats)
+                return dict(stats)
                 
         except Exception as e:
-            self.logger.error(f"获取数据库统计信息失败: {e}")
+            self.logger.error("获取数据库统计信息失败: %s", e)
             return {}
     
+    def _process_orphans_in_batches(self, cursor, connection, select_sql: str, apply_sql: str) -> int:
+        """
+        分批处理孤立数据，每批单独提交以缩短持锁时间、控制undo日志大小
+        
+        MySQL 的多表 UPDATE/DELETE 不支持 LIMIT，因此先用反连接查出一批ID，
+        再按主键执行处理语句（处理语句中重新校验孤立条件）。
+        
+        Args:
+            select_sql: 查询孤立行ID的语句（不含LIMIT）
+            apply_sql: 处理语句，包含 {placeholders} 占位
+            
+        Returns:
+            处理的总行数
+        """
+        total = 0
+        while True:
+            cursor.execute(f"{select_sql} LIMIT %s", (self.ORPHAN_BATCH_SIZE,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            
+            placeholders = _placeholders(len(ids))
+            cursor.execute(apply_sql.format(placeholders=placeholders), ids)
+            total += cursor.rowcount
+            connection.commit()
+            db_manager.note_mutation()
+            
+            if len(ids) < self.ORPHAN_BATCH_SIZE:
+                break
+        return total
+    
+    def _cleanup_orphans_step(self, select_sql: str, apply_sql: str) -> int:
+        """在独立连接上分批执行一个孤立数据清理步骤"""
+        with db_manager.get_tuple_cursor() as (cursor, connection):
+            return self._process_orphans_in_batches(cursor, connection, select_sql, apply_sql)
+    
     def cleanup_orphaned_data(self) -> Dict[str, Any]:
-        """清理孤立数据"""
+        """清理孤立数据（同一时间只允许一个进程执行）"""
+        return self._run_exclusive('data_cleaner:cleanup_orphans', self._cleanup_orphaned_data)
+    
+    def _cleanup_orphaned_data(self) -> Dict[str, Any]:
+        """
+        清理孤立数据
+        
+        三个清理步骤互不依赖，parallel_orphan_cleanup 启用时在各自的连接上并发执行
+        """
         self.logger.info("开始清理孤立数据")
         start_time = self._get_beijing_time()
         
         try:
-            with db_manager.get_cursor() as (cursor, connection):
-                # 清理没有关联主题的回复（理论上不应该存在，因为有外键约束）
-                cursor.execute("""
-                    DELETE p FROM posts p
-                    LEFT JOIN topics t ON p.topic_id = t.id
-                    WHERE t.id IS NULL
-                """)
-                orphaned_posts = cursor.rowcount
-                
-                # 清理没有关联用户的数据（设置为NULL，不删除）
-                cursor.execute("""
-                    UPDATE topics SET author_id = NULL
-                    WHERE author_id NOT IN (SELECT id FROM users)
-                """)
-                orphaned_topic_authors = cursor.rowcount
-                
-                cursor.execute("""
-                    UPDATE posts SET user_id = NULL
-                    WHERE user_id NOT IN (SELECT id FROM users)
-                """)
-                orphaned_post_authors = cursor.rowcount
-                
-                connection.commit()
-                
-                end_time = self._get_beijing_time()
-                duration = (end_time - start_time).total_seconds()
-                
-                result = {
-                    'success': True,
-                    'orphaned_posts_deleted': orphaned_posts,
-                    'orphaned_topic_authors_fixed': orphaned_topic_authors,
-                    'orphaned_post_authors_fixed': orphaned_post_authors,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'duration_seconds': duration
+            steps = self.ORPHAN_CLEANUP_STEPS
+            if self.parallel_orphan_cleanup:
+                with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+                    futures = {
+                        key: executor.submit(self._cleanup_orphans_step, select_sql, apply_sql)
+                        for key, select_sql, apply_sql in steps
+                    }
+                    counts = {key: future.result() for key, future in futures.items()}
+            else:
+                counts = {
+                    key: self._cleanup_orphans_step(select_sql, apply_sql)
+                    for key, select_sql, apply_sql in steps
                 }
-                
-                self.logger.info(f"孤立数据清理完成: 删除 {orphaned_posts} 个孤立回复，"
-                               f"修复 {orphaned_topic_authors} 个主题作者，"
-                               f"修复 {orphaned_post_authors} 个回复作者，"
-                               f"耗时 {duration:.2f} 秒")
-                
-                return result
+            
+            orphaned_posts = counts['orphaned_posts_deleted']
+            orphaned_topic_authors = counts['orphaned_topic_authors_fixed']
+            orphaned_post_authors = counts['orphaned_post_authors_fixed']
+            
+            end_time = self._get_beijing_time()
+            duration = (end_time - start_time).total_seconds()
+            
+            result = {
+                'success': True,
+                'orphaned_posts_deleted': orphaned_posts,
+                'orphaned_topic_authors_fixed': orphaned_topic_authors,
+                'orphaned_post_authors_fixed': orphaned_post_authors,
+                'start_time': start_time,
+                'end_time': end_time,
+                'duration_seconds': duration
+            }
+            
+            self.logger.info("孤立数据清理完成: 删除 %d 个孤立回复，"
+                           "修复 %d 个主题作者，"
+                           "修复 %d 个回复作者，"
+                           "耗时 %.2f 秒",
+                           orphaned_posts, orphaned_topic_authors, orphaned_post_authors, duration)
+            
+            return result
                 
         except Exception as e:
-            self.logger.error(f"清理孤立数据失败: {e}")
+            self.logger.error("清理孤立数据失败: %s", e)
             return {
                 'success': False,
                 'error': str(e),
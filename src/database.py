@@ -4,110 +4,363 @@
 """
 import pymysql
 import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
 from typing import List, Dict, Any, Optional
 from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import itemgetter
+from dbutils.pooled_db import PooledDB
 from datetime import datetime, timezone, timedelta
 
 from .config import config
 
+# 北京时区（UTC+8），模块级缓存避免每次调用重复构造
+_BEIJING_TZ = timezone(timedelta(hours=8))
+
+# 无符号整数字段上限
+_SMALLINT_UNSIGNED_MAX = 65535
+_INT_UNSIGNED_MAX = 4294967295
+
+# 可重试的临时错误码：死锁、锁等待超时、连接断开（MySQL server has gone away / Lost connection）
+_TRANSIENT_ERROR_CODES = (1213, 1205, 2006, 2013)
+
+# 服务端或客户端禁用 LOAD DATA LOCAL INFILE 时返回的错误码
+_LOCAL_INFILE_DISABLED_CODES = (1148, 3948)
+
+# 字符串字段长度限制：(字段名, 最大字符数, 日志中的名称)
+_USER_FIELD_LIMITS = (
+    ('username', 50, '用户名'),
+    ('avatar_url', 200, '头像URL'),
+)
+_TOPIC_FIELD_LIMITS = (
+    ('title', 500, '标题'),
+    ('url', 200, 'URL'),
+    ('category', 50, '分类名'),
+    ('tags', 500, '标签'),
+)
+
+# 数值字段范围限制：(字段名, 空值时的默认值, 下限, 上限, 日志中的名称)
+# 默认值为 None 的字段为空时保持原样（如主楼的 reply_to_post_number）
+_TOPIC_INT_LIMITS = (
+    ('reply_count', 0, 0, _SMALLINT_UNSIGNED_MAX, '回复数'),
+    ('view_count', 0, 0, _INT_UNSIGNED_MAX, '浏览数'),
+)
+_POST_INT_LIMITS = (
+    ('post_number', 1, 1, _SMALLINT_UNSIGNED_MAX, '楼层号'),
+    ('reply_to_post_number', None, 1, _SMALLINT_UNSIGNED_MAX, '回复楼层号'),
+    ('like_count', 0, 0, _SMALLINT_UNSIGNED_MAX, '点赞数'),
+)
+
+# 回复内容最大字符数，以及超长截断时按优先级依次尝试的分隔符
+_POST_MAX_CHARS = 20000
+_TRUNCATE_DELIMITERS = ('\n\n', '\n', '。', '？', '！', '.', '?', '!')
+# 为追加在截断内容后的说明文字预留的字符数
+_TRUNCATE_NOTE_RESERVE = 64
+
+# 报告内容 zlib 压缩级别
+_REPORT_COMPRESS_LEVEL = 6
+
+# executemany 改写出的单条多行 INSERT 语句的最大长度（PyMySQL 默认约 1 MB），
+# 不超过 MySQL 5.7 默认的 max_allowed_packet（4 MiB），预留包头余量
+_WRITE_MAX_STMT_LENGTH = 4 * 1024 * 1024 - 1024
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """判断数据库异常是否为可重试的临时错误"""
+    return (isinstance(error, (pymysql.err.OperationalError, pymysql.err.InternalError))
+            and bool(error.args) and error.args[0] in _TRANSIENT_ERROR_CODES)
+
+
+@lru_cache(maxsize=128)
+def _placeholders(count: int) -> str:
+    """IN 列表的占位符串 '%s,%s,...'（按数量缓存，分批时大多数批次数量相同）"""
+    return ','.join(['%s'] * count)
+
+
+class _WriteCursor(pymysql.cursors.Cursor):
+    """
+    写入使用的元组游标，放宽 executemany 的单条语句长度上限，减少多行 INSERT 被拆分的次数
+
+    连接池返回的是 DBUtils 包装后的游标，在包装对象上赋值不会传递给 PyMySQL 游标，
+    因此长度上限定义在游标类上，通过 cursor(_WriteCursor) 创建游标时生效。
+    """
+    max_stmt_length = _WRITE_MAX_STMT_LENGTH
+
+
+def _tsv_field(value: Any) -> str:
+    """将值转为 LOAD DATA 默认格式（制表符分隔、反斜杠转义）的字段文本，None 写为 \\N"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _with_retry(max_attempts: int = 3, base_delay: float = 0.05):
+    """
+    写入方法的重试装饰器：遇到临时错误时按指数退避重试整个方法，每次重试重新从连接池取连接
+
+    调用方传入 cursor（外部事务）时不重试：事务已被回滚，应由事务发起方整体重做
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if kwargs.get('cursor') is not None:
+                return func(self, *args, **kwargs)
+            for attempt in range(max_attempts):
+                try:
+                    return func(self, *args, **kwargs)
+                except Exception as e:
+                    if not _is_transient_error(e) or attempt == max_attempts - 1:
+                        raise
+                    delay = base_delay * 2 ** attempt
+                    self.logger.warning(
+                        f"{func.__name__} 遇到临时数据库错误，{delay:.2f} 秒后重试 ({attempt + 1}/{max_attempts}): {e}"
+                    )
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
 
 class DatabaseManager:
     """数据库管理类"""
+
+    # 按ID列表批量更新时每条语句包含的最大ID数量
+    ID_CHUNK_SIZE = 1000
+
+    # 批量写入回复时每块的最大条数和最大内容字符数（utf8mb4 下约 4 MiB）
+    POST_CHUNK_ROWS = 200
+    POST_CHUNK_MAX_CHARS = 1024 * 1024
+    # 单批回复达到该条数时改用 LOAD DATA LOCAL INFILE 导入（远大于爬虫批量写入器每批约 500 条的规模，
+    # 日常写入都走 executemany，只有一次性导入大量回复时才值得新建专用连接）
+    POST_BULK_LOAD_MIN_ROWS = 20000
+
+    # 清理过期数据时每批删除的最大主题数
+    CLEANUP_BATCH_SIZE = 1000
+    # 清理过期数据时单个连接的最长使用时间（秒），超过后重建连接
+    CONNECTION_RECYCLE_SECONDS = 180
+    # 清理过期数据时遇到临时错误（死锁、连接断开等）的最大重试次数
+    CLEANUP_MAX_RETRIES = 3
+
+    # 进程内缓存的已存在用户ID上限（超过后淘汰最早记录的用户ID）
+    KNOWN_USERS_MAX = 50000
+
+    # 热度分数计算表达式，参数依次为: max_score, view_weight, reply_weight, like_weight,
+    # 1 / time_decay_hours（预先计算倒数，逐行计算时用乘法代替除法）
+    HOTNESS_SET_CLAUSE = """SET hotness_score = LEAST(%s, GREATEST(0.1,
+            (view_count * %s + reply_count * %s + total_like_count * %s) *
+            GREATEST(0.1, 1 - TIMESTAMPDIFF(HOUR, last_activity_at, NOW()) * %s)
+        ))"""
+
+    # 写入语句（executemany 时 PyMySQL 会将其改写为多行 VALUES 的单条语句）
+    # 使用位置参数，参数元组由对应的 *_PARAMS（itemgetter）从清理后的字典中按列顺序取出
+    INSERT_USER_SQL = """
+        INSERT IGNORE INTO users (id, username, avatar_url, first_seen_at)
+        VALUES (%s, %s, %s, %s)
+        """
+    USER_PARAMS = itemgetter('id', 'username', 'avatar_url', 'first_seen_at')
+
+    # 单个主题写入：不覆盖已有主题的 url 和 author_id
+    UPSERT_TOPIC_SQL = """
+        INSERT INTO topics (id, title, url, category, author_id, reply_count, view_count, 
+                           created_at, last_activity_at, tags, crawled_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            title = VALUES(title),
+            category = VALUES(category),
+            reply_count = VALUES(reply_count),
+            view_count = VALUES(view_count),
+            last_activity_at = VALUES(last_activity_at),
+            tags = VALUES(tags),
+            crawled_at = VALUES(crawled_at)
+        """
+
+    # 主题写入语句（UPSERT_TOPIC_SQL、BATCH_UPSERT_TOPICS_SQL）共用的参数顺序
+    TOPIC_PARAMS = itemgetter('id', 'title', 'url', 'category', 'author_id', 'reply_count', 'view_count',
+                              'created_at', 'last_activity_at', 'tags', 'crawled_at')
+
+    BATCH_UPSERT_TOPICS_SQL = """
+        INSERT INTO topics (
+            id, title, url, category, author_id, 
+            reply_count, view_count, created_at, last_activity_at, tags, crawled_at
+        ) VALUES (
+            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+        ) ON DUPLICATE KEY UPDATE
+            title = VALUES(title),
+            url = VALUES(url),
+            category = VALUES(category),
+            author_id = VALUES(author_id),
+            reply_count = VALUES(reply_count),
+            view_count = VALUES(view_count),
+            last_activity_at = VALUES(last_activity_at),
+            tags = VALUES(tags),
+            crawled_at = VALUES(crawled_at)
+        """
+
+    UPSERT_POST_SQL = """
+        INSERT INTO posts (id, topic_id, user_id, post_number, reply_to_post_number,
+                          content_raw, like_count, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            content_raw = VALUES(content_raw),
+            like_count = VALUES(like_count)
+        """
+
+    POST_COLUMNS = ('id', 'topic_id', 'user_id', 'post_number', 'reply_to_post_number',
+                    'content_raw', 'like_count', 'created_at')
+    POST_PARAMS = itemgetter(*POST_COLUMNS)
+
+    # 大批量导入回复：临时文件（LOAD DATA 默认格式）先导入会话级临时表，
+    # 再用与 UPSERT_POST_SQL 相同的 ON DUPLICATE KEY UPDATE 合并进 posts（外键、唯一键检查照常进行）。
+    # 临时表不带 posts 的主键和唯一键（LOAD DATA LOCAL 遇到重复键会静默跳过后出现的行），
+    # 按导入顺序编号 seq 后依次合并，同一批中重复的回复与 executemany 一样以最后一条为准
+    CREATE_POST_STAGE_SQL = (
+        "CREATE TEMPORARY TABLE posts_load_stage (seq INT UNSIGNED AUTO_INCREMENT PRIMARY KEY) "
+        f"SELECT {', '.join(POST_COLUMNS)} FROM posts LIMIT 0"
+    )
+    LOAD_POST_STAGE_SQL = (
+        "LOAD DATA LOCAL INFILE %s INTO TABLE posts_load_stage CHARACTER SET utf8mb4 "
+        f"({', '.join(POST_COLUMNS)})"
+    )
+    MERGE_POST_STAGE_SQL = (
+        f"INSERT INTO posts ({', '.join(POST_COLUMNS)}) "
+        f"SELECT {', '.join(POST_COLUMNS)} FROM posts_load_stage s ORDER BY s.seq "
+        "ON DUPLICATE KEY UPDATE content_raw = s.content_raw, like_count = s.like_count"
+    )
+
+    LAST_ACTIVITY_SQL = "SELECT last_activity_at FROM topics WHERE id = %s"
+
+    # 旧版本维护 row_count_cache 行数缓存表的触发器（每次写入都会争用同一行计数），初始化时与该表一并删除
+    LEGACY_ROW_COUNT_TRIGGERS = (
+        *(f"trg_{table}_count_{event}" for table in ('users', 'topics', 'posts') for event in ('insert', 'delete')),
+        'trg_topics_cascade_posts_count'
+    )
     
     def __init__(self):
         self.db_config = config.get_database_config()
         self.logger = logging.getLogger(__name__)
+
+        # 连接池：是否只读 -> 连接池（首次获取连接时创建）
+        self._pools: Dict[bool, PooledDB] = {}
+        self._pool_lock = threading.Lock()
+
+        # 数据变更计数：每次提交影响行数统计的写入后递增，供统计信息缓存判断数据是否变化
+        self.mutation_count = 0
+
+        # 服务端拒绝 LOAD DATA LOCAL INFILE 后置为 False，之后的大批量回复直接使用 executemany
+        self._bulk_load_enabled = True
+
+        # 本进程已写入 users 表的用户ID（写入提交后记录，按记录顺序保存以便淘汰最早的ID），
+        # 命中时跳过 INSERT IGNORE；用户数据只增不删，缓存不会失效
+        self._known_user_ids: Dict[int, None] = {}
+        self._known_users_lock = threading.Lock()
+
+    def note_mutation(self):
+        """记录一次数据变更（使统计信息缓存失效）"""
+        self.mutation_count += 1
     
+    def _is_known_user(self, user_id: Optional[int]) -> bool:
+        """用户ID是否已由本进程写入过数据库"""
+        return user_id in self._known_user_ids
+
+    def _remember_users(self, user_ids: List[int]):
+        """记录已写入数据库的用户ID（须在事务提交后调用），超过上限时淘汰最早记录的ID"""
+        with self._known_users_lock:
+            known = self._known_user_ids
+            for user_id in user_ids:
+                # 重新插入，使最近写入的ID排在最后
+                known.pop(user_id, None)
+                known[user_id] = None
+            while len(known) > self.KNOWN_USERS_MAX:
+                del known[next(iter(known))]
+
     def get_beijing_time(self) -> datetime:
         """获取当前北京时间"""
-        return datetime.now(timezone.utc) + timedelta(hours=8)
+        return datetime.now(_BEIJING_TZ)
     
-    def _sanitize_user_data(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        """清理和验证用户数据，确保符合数据库字段限制"""
-        sanitized = user_data.copy()
-        
-        # 截断字符串字段
-        if 'username' in sanitized and sanitized['username']:
-            original = str(sanitized['username'])
-            sanitized['username'] = original[:50]
-            if len(original) > 50:
-                self.logger.warning(f"用户名被截断: {original[:20]}... -> {sanitized['username']}")
-        
-        if 'avatar_url' in sanitized and sanitized['avatar_url']:
-            original = str(sanitized['avatar_url'])
-            sanitized['avatar_url'] = original[:200]
-            if len(original) > 200:
-                self.logger.warning(f"头像URL被截断: {original[:50]}...")
-        
+    def _truncate_fields(self, data: Dict[str, Any], limits) -> None:
+        """按 (字段名, 最大长度, 日志名称) 表依次将字符串字段转为 str 并截断，发生截断时记录警告"""
+        for key, max_len, label in limits:
+            value = data.get(key)
+            if not value:
+                continue
+            if type(value) is not str:
+                value = str(value)
+            if len(value) > max_len:
+                self.logger.warning(f"{label}被截断: {value[:50]}...")
+                value = value[:max_len]
+            data[key] = value
+    
+    def _clamp_fields(self, data: Dict[str, Any], limits) -> None:
+        """按 (字段名, 默认值, 下限, 上限, 日志名称) 表将数值字段转为 int 并限制在字段范围内，超出上限时记录警告"""
+        for key, default, low, high, label in limits:
+            if key not in data:
+                continue
+            value = data[key]
+            if not value:
+                if default is None:
+                    continue
+                value = default
+            elif type(value) is not int:
+                value = int(value)
+            if value > high:
+                self.logger.warning(f"{label}超出范围被限制: {value} -> {high}")
+                value = high
+            elif value < low:
+                value = low
+            data[key] = value
+    
+    def _sanitize_user_data(self, user_data: Dict[str, Any], inplace: bool = False) -> Dict[str, Any]:
+        """
+        清理和验证用户数据，确保符合数据库字段限制
+
+        默认浅拷贝后修改（调用方在写库后仍可能使用原始数据）；inplace=True 时直接修改传入的字典，
+        用于调用方不再使用原始数据的批量写入
+        """
+        sanitized = user_data if inplace else user_data.copy()
+        self._truncate_fields(sanitized, _USER_FIELD_LIMITS)
         return sanitized
     
     def _sanitize_topic_data(self, topic_data: Dict[str, Any]) -> Dict[str, Any]:
         """清理和验证主题数据，确保符合数据库字段限制"""
+        # 浅拷贝：调用方在写库后仍会使用原始数据（如按主题URL抓取详情）
         sanitized = topic_data.copy()
-        
-        # 截断字符串字段
-        if 'title' in sanitized and sanitized['title']:
-            original = str(sanitized['title'])
-            sanitized['title'] = original[:500]
-            if len(original) > 500:
-                self.logger.warning(f"标题被截断: {original[:50]}...")
-        
-        if 'url' in sanitized and sanitized['url']:
-            original = str(sanitized['url'])
-            sanitized['url'] = original[:200]
-            if len(original) > 200:
-                self.logger.warning(f"URL被截断: {original}")
-        
-        if 'category' in sanitized and sanitized['category']:
-            original = str(sanitized['category'])
-            sanitized['category'] = original[:50]
-            if len(original) > 50:
-                self.logger.warning(f"分类名被截断: {original}")
-        
-        if 'tags' in sanitized and sanitized['tags']:
-            original = str(sanitized['tags'])
-            sanitized['tags'] = original[:500]
-            if len(original) > 500:
-                self.logger.warning(f"标签被截断: {original[:50]}...")
-        
-        # 限制数值字段范围
-        if 'reply_count' in sanitized:
-            original_count = int(sanitized['reply_count'] or 0)
-            sanitized['reply_count'] = min(max(original_count, 0), 65535)
-            if original_count > 65535:
-                self.logger.warning(f"回复数超出范围被限制: {original_count} -> 65535")
-        
-        if 'view_count' in sanitized:
-            original_count = int(sanitized['view_count'] or 0)
-            sanitized['view_count'] = min(max(original_count, 0), 4294967295)
-            if original_count > 4294967295:
-                self.logger.warning(f"浏览数超出范围被限制: {original_count} -> 4294967295")
-        
+        self._truncate_fields(sanitized, _TOPIC_FIELD_LIMITS)
+        self._clamp_fields(sanitized, _TOPIC_INT_LIMITS)
         return sanitized
     
-    def _sanitize_post_data(self, post_data: Dict[str, Any]) -> Dict[str, Any]:
-        """清理和验证帖子数据，确保符合数据库字段限制"""
-        sanitized = post_data.copy()
+    def _sanitize_post_data(self, post_data: Dict[str, Any], inplace: bool = False) -> Dict[str, Any]:
+        """
+        清理和验证帖子数据，确保符合数据库字段限制（inplace 含义同 _sanitize_user_data）
+
+        截断后的内容连同截断说明不超过 _POST_MAX_CHARS，重复清理（如写入重试）时不会再次截断
+        """
+        sanitized = post_data if inplace else post_data.copy()
         
         # 限制内容长度 (TEXT字段最大65535字节，utf8mb4每字符最多4字节)
-        if 'content_raw' in sanitized and sanitized['content_raw']:
-            original_content = str(sanitized['content_raw'])
-            # 提高限制到20000字符，更好地利用TEXT字段的容量
-            max_chars = 20000
-            if len(original_content) > max_chars:
+        content = sanitized.get('content_raw')
+        if content:
+            original_content = str(content)
+            # 提高限制到20000字符，更好地利用TEXT字段的容量（为截断说明预留长度）
+            if len(original_content) > _POST_MAX_CHARS:
+                max_chars = _POST_MAX_CHARS - _TRUNCATE_NOTE_RESERVE
                 # 智能截断：尝试在段落、句子或空格处截断
                 truncated = original_content[:max_chars]
+                # 只在末尾20%范围内查找分隔符，确保不会截掉太多内容
+                min_pos = int(max_chars * 0.8) + 1
                 
                 # 尝试在段落分隔符处截断
-                for delimiter in ['\n\n', '\n', '。', '？', '！', '.', '?', '!']:
-                    last_pos = truncated.rfind(delimiter)
-                    if last_pos > max_chars * 0.8:  # 确保不会截掉太多内容
+                for delimiter in _TRUNCATE_DELIMITERS:
+                    last_pos = truncated.rfind(delimiter, min_pos)
+                    if last_pos != -1:
                         truncated = truncated[:last_pos + len(delimiter)]
                         break
                 else:
                     # 如果找不到合适的分隔符，在最后一个空格处截断
-                    last_space = truncated.rfind(' ')
-                    if last_space > max_chars * 0.8:
+                    last_space = truncated.rfind(' ', min_pos)
+                    if last_space != -1:
                         truncated = truncated[:last_space]
                 
                 sanitized['content_raw'] = truncated + "\n\n...[[内容过长已被截断]]\n原始长度: {}字符".format(len(original_content))
@@ -115,73 +368,98 @@ class DatabaseManager:
             else:
                 sanitized['content_raw'] = original_content
         
-        # 限制数值字段范围
-        if 'post_number' in sanitized:
-            original_num = int(sanitized['post_number'] or 1)
-            sanitized['post_number'] = min(max(original_num, 1), 65535)
-            if original_num > 65535:
-                self.logger.warning(f"楼层号超出范围被限制: {original_num} -> 65535")
-        
-        if 'reply_to_post_number' in sanitized and sanitized['reply_to_post_number']:
-            original_num = int(sanitized['reply_to_post_number'])
-            sanitized['reply_to_post_number'] = min(max(original_num, 1), 65535)
-            if original_num > 65535:
-                self.logger.warning(f"回复楼层号超出范围被限制: {original_num} -> 65535")
-        
-        if 'like_count' in sanitized:
-            original_count = int(sanitized['like_count'] or 0)
-            sanitized['like_count'] = min(max(original_count, 0), 65535)
-            if original_count > 65535:
-                self.logger.warning(f"点赞数超出范围被限制: {original_count} -> 65535")
-        
+        self._clamp_fields(sanitized, _POST_INT_LIMITS)
         return sanitized
     
-    def get_connection(self):
-        """获取数据库连接"""
+    def _get_connect_kwargs(self) -> Dict[str, Any]:
+        """根据配置构造 pymysql.connect 的连接参数"""
+        # 根据配置决定SSL是否启用
+        ssl_mode = self.db_config.get('ssl_mode', 'disabled')
+        ssl_enabled = ssl_mode.lower() != 'disabled'
+
+        # 从配置中安全地获取数据库连接参数
+        db_port_str = self.db_config.get('port')
+
+        return {
+            'host': self.db_config.get('host'),
+            'port': int(db_port_str) if db_port_str else 3306,  # 确保端口是整数
+            'user': self.db_config.get('user'),
+            'password': self.db_config.get('password'),
+            'database': self.db_config.get('database'),
+            'charset': 'utf8mb4',
+            'ssl': {'check_hostname': True} if ssl_enabled else None,  # 传递非空字典启用SSL
+            'autocommit': False
+        }
+
+    def _get_pool(self, readonly: bool = False) -> PooledDB:
+        """
+        获取连接池（首次使用时创建）
+
+        读写连接池：autocommit=False，连接归还时回滚未提交的事务；
+        只读连接池：autocommit=True、READ COMMITTED，查询不开启事务，归还时无需回滚
+        """
+        pool = self._pools.get(readonly)
+        if pool is None:
+            with self._pool_lock:
+                pool = self._pools.get(readonly)
+                if pool is None:
+                    connect_kwargs = self._get_connect_kwargs()
+                    max_connections = self.db_config.get('pool_max_connections', 10)
+                    self.logger.info(
+                        f"Creating {'read-only' if readonly else 'read-write'} database connection pool: "
+                        f"Host={connect_kwargs['host']}, Port={connect_kwargs['port']}, "
+                        f"SSL Mode={self.db_config.get('ssl_mode', 'disabled')}, Max Connections={max_connections}"
+                    )
+                    if readonly:
+                        connect_kwargs['autocommit'] = True
+                        connect_kwargs['init_command'] = "SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED"
+                    # blocking=True：连接数达到上限时等待归还而不是报错；ping=1：取出连接时检查是否可用
+                    pool = PooledDB(
+                        creator=pymysql,
+                        mincached=min(2, max_connections),
+                        maxcached=max_connections,
+                        maxconnections=max_connections,
+                        blocking=True,
+                        reset=not readonly,
+                        ping=1,
+                        **connect_kwargs
+                    )
+                    self._pools[readonly] = pool
+        return pool
+
+    def get_connection(self, pooled: bool = True, readonly: bool = False):
+        """
+        获取数据库连接
+
+        Args:
+            pooled: 是否从连接池获取（默认）。连接池中的连接 close() 时归还连接池而不是断开；
+                    需要真正新建/断开连接的场景（如长时间清理时重建连接）传 False
+            readonly: 是否从只读连接池获取（autocommit，仅用于只读查询）
+        """
         try:
-            # 根据配置决定SSL是否启用
-            ssl_mode = self.db_config.get('ssl_mode', 'disabled')
-            ssl_enabled = ssl_mode.lower() != 'disabled'
-            
-            self.logger.info(f"Connecting to database: Host={self.db_config.get('host')}, Port={self.db_config.get('port')}, SSL Mode={ssl_mode}, SSL Enabled={ssl_enabled}")
-
-            # 从配置中安全地获取数据库连接参数
-            db_host = self.db_config.get('host')
-            db_port_str = self.db_config.get('port')
-            db_user = self.db_config.get('user')
-            db_password = self.db_config.get('password')
-            db_name = self.db_config.get('database')
-
-            # 确保端口是整数
-            db_port = int(db_port_str) if db_port_str else 3306
-
-            connection = pymysql.connect(
-                host=db_host,
-                port=db_port,
-                user=db_user,
-                password=db_password,
-                database=db_name,
-                charset='utf8mb4',
-                ssl={'check_hostname': True} if ssl_enabled else None,  # 传递非空字典启用SSL
-                autocommit=False
-            )
-            return connection
+            if pooled:
+                return self._get_pool(readonly).connection()
+            return pymysql.connect(**self._get_connect_kwargs())
         except Exception as e:
             self.logger.error(f"数据库连接失败: {e}")
             raise
     
     @contextmanager
-    def get_cursor(self):
-        """获取数据库游标的上下文管理器"""
+    def get_cursor(self, cursor_class=pymysql.cursors.DictCursor, pooled: bool = True, readonly: bool = False):
+        """获取数据库游标的上下文管理器（默认返回字典行，使用读写连接池中的连接）"""
         connection = None
         cursor = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            connection = self.get_connection(pooled, readonly)
+            cursor = connection.cursor(cursor_class)
             yield cursor, connection
         except Exception as e:
             if connection:
-                connection.rollback()
+                try:
+                    connection.rollback()
+                except Exception:
+                    # 连接已断开时回滚也会失败，保留原始异常（供调用方判断是否可重试）
+                    pass
             self.logger.error(f"数据库操作失败: {e}")
             raise
         finally:
@@ -190,6 +468,36 @@ class DatabaseManager:
             if connection:
                 connection.close()
     
+    @contextmanager
+    def advisory_lock(self, name: str):
+        """
+        获取 MySQL 命名锁（GET_LOCK）的上下文管理器，不等待，返回是否获取成功
+
+        命名锁绑定在连接上，因此在上下文期间一直占用一个独立的非连接池连接，
+        避免释放失败时锁随连接留在连接池中
+        """
+        with self.get_cursor(pooled=False) as (cursor, connection):
+            cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (name,))
+            acquired = bool(cursor.fetchone()['acquired'])
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+    
+    def get_tuple_cursor(self, readonly: bool = False):
+        """获取返回元组行的游标上下文管理器（行结构固定、按位置取值时使用，省去逐行构造字典）"""
+        return self.get_cursor(pymysql.cursors.Cursor, readonly=readonly)
+    
+    def get_ro_cursor(self, cursor_class=pymysql.cursors.DictCursor):
+        """
+        获取只读查询游标的上下文管理器
+
+        使用 autocommit 连接：查询不开启事务，省去结束时的 COMMIT/ROLLBACK 往返，也不长期持有读视图。
+        只能用于不需要事务一致性的只读查询。
+        """
+        return self.get_cursor(cursor_class, readonly=True)
+    
     def init_database(self):
         """初始化数据库表结构"""
         create_tables_sql = [
@@ -199,7 +507,7 @@ class DatabaseManager:
                 username VARCHAR(50) UNIQUE NOT NULL COMMENT '用户名',
                 avatar_url VARCHAR(200) COMMENT '头像URL',
                 first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '首次采集到该用户的时间'
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED;
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=DYNAMIC;
             """,
             """
             CREATE TABLE IF NOT EXISTS topics (
@@ -221,6 +529,8 @@ class DatabaseManager:
                 INDEX idx_created_at (created_at),
                 INDEX idx_reply_count (reply_count),
                 INDEX idx_hotness_score (hotness_score),
+                INDEX idx_hotness_category (hotness_score, category, total_like_count),
+                INDEX idx_cat_hot (category, hotness_score),
                 FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE SET NULL
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED;
             """,
@@ -241,7 +551,7 @@ class DatabaseManager:
                 
                 FOREIGN KEY (topic_id) REFERENCES topics(id) ON DELETE CASCADE,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED;
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=DYNAMIC;
             """,
             """
             CREATE TABLE IF NOT EXISTS reports (
@@ -252,7 +562,8 @@ class DatabaseManager:
                 analysis_period_end TIMESTAMP NOT NULL COMMENT '分析数据的结束时间',
                 topics_analyzed SMALLINT UNSIGNED DEFAULT 0 COMMENT '分析的主题数量',
                 report_title VARCHAR(200) NOT NULL COMMENT '报告标题',
-                report_content MEDIUMTEXT NOT NULL COMMENT '报告内容(Markdown格式)',
+                report_content MEDIUMTEXT NOT NULL COMMENT '报告内容(Markdown格式)，已压缩存储的报告为空字符串',
+                report_content_z MEDIUMBLOB NULL COMMENT 'zlib压缩的报告内容(UTF-8)',
                 generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '报告生成时间',
 
                 INDEX idx_category (category),
@@ -269,39 +580,116 @@ class DatabaseManager:
             
             # 升级现有表结构
             try:
+                # 一次查询取出需要检查的字段类型、索引和行格式：
+                # (表名, 字段名或索引名) -> 字段类型，索引为 'INDEX'；(表名, 'ROW_FORMAT') -> 行格式
+                cursor.execute("""
+                    SELECT TABLE_NAME AS table_name, COLUMN_NAME AS name, COLUMN_TYPE AS type
+                    FROM information_schema.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('reports', 'topics', 'posts')
+                    UNION ALL
+                    SELECT DISTINCT TABLE_NAME, INDEX_NAME, 'INDEX'
+                    FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'topics'
+                    UNION ALL
+                    SELECT TABLE_NAME, 'ROW_FORMAT', ROW_FORMAT
+                    FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('users', 'posts')
+                """)
+                existing = {(row['table_name'], row['name']): row['type'].lower() for row in cursor.fetchall()}
+
                 # 升级 reports.id 字段从 MEDIUMINT 解决自增溢出问题
-                cursor.execute("SHOW COLUMNS FROM reports WHERE Field = 'id'")
-                result = cursor.fetchone()
-                if result and 'mediumint' in result['Type'].lower():
+                if 'mediumint' in existing.get(('reports', 'id'), ''):
                     cursor.execute("ALTER TABLE reports MODIFY COLUMN id INT UNSIGNED AUTO_INCREMENT COMMENT '报告唯一ID'")
                     self.logger.info("已将 reports 表的 id 字段从 MEDIUMINT 升级为 INT UNSIGNED")
 
+                # 为reports表添加压缩内容字段（已有报告保持原样，读取时兼容）
+                if ('reports', 'report_content_z') not in existing:
+                    cursor.execute("ALTER TABLE reports ADD COLUMN report_content_z MEDIUMBLOB NULL COMMENT 'zlib压缩的报告内容(UTF-8)' AFTER report_content")
+                    self.logger.info("已为reports表添加report_content_z字段")
+
                 # 为topics表添加热度相关字段
-                cursor.execute("SHOW COLUMNS FROM topics LIKE 'total_like_count'")
-                if cursor.rowcount == 0:
+                if ('topics', 'total_like_count') not in existing:
                     cursor.execute("ALTER TABLE topics ADD COLUMN total_like_count INT UNSIGNED DEFAULT 0 COMMENT '主题下所有回复的总点赞数'")
                     self.logger.info("已为topics表添加total_like_count字段")
                     
-                cursor.execute("SHOW COLUMNS FROM topics LIKE 'hotness_score'")
-                if cursor.rowcount == 0:
+                if ('topics', 'hotness_score') not in existing:
                     cursor.execute("ALTER TABLE topics ADD COLUMN hotness_score DECIMAL(10, 4) DEFAULT 0.0 COMMENT '热度分数，基于浏览数、回复数、点赞数和时间衰减'")
                     cursor.execute("ALTER TABLE topics ADD INDEX idx_hotness_score (hotness_score)")
                     self.logger.info("已为topics表添加hotness_score字段和索引")
+
+                # 为热度统计和热门主题查询添加组合索引
+                if ('topics', 'idx_hotness_category') not in existing:
+                    cursor.execute("ALTER TABLE topics ADD INDEX idx_hotness_category (hotness_score, category, total_like_count)")
+                    self.logger.info("已为topics表添加idx_hotness_category组合索引")
+
+                # 按分类取热门主题时，在分类内按热度顺序读取索引，取够 LIMIT 条即停止，无需排序
+                if ('topics', 'idx_cat_hot') not in existing:
+                    cursor.execute("ALTER TABLE topics ADD INDEX idx_cat_hot (category, hotness_score)")
+                    self.logger.info("已为topics表添加idx_cat_hot组合索引")
+                
+                # 写入频繁的users和posts表从 COMPRESSED 改为 DYNAMIC 行格式，避免每次修改都要重新压缩页
+                for table in ('users', 'posts'):
+                    if existing.get((table, 'ROW_FORMAT')) == 'compressed':
+                        cursor.execute(f"ALTER TABLE {table} ROW_FORMAT=DYNAMIC, ALGORITHM=INPLACE")
+                        self.logger.info(f"已将{table}表的行格式从 COMPRESSED 改为 DYNAMIC")
                 
                 # 升级posts表的like_count字段从 TINYINT 到 SMALLINT
-                cursor.execute("SHOW COLUMNS FROM posts WHERE Field = 'like_count'")
-                result = cursor.fetchone()
-                if result and 'tinyint' in result['Type'].lower():
+                if 'tinyint' in existing.get(('posts', 'like_count'), ''):
                     cursor.execute("ALTER TABLE posts MODIFY COLUMN like_count SMALLINT UNSIGNED DEFAULT 0 COMMENT '点赞数'")
                     self.logger.info("已将posts表的like_count字段从 TINYINT 升级为 SMALLINT")
             except Exception as e:
                 self.logger.warning(f"升级表结构时出错: {e}")
             
+            # 删除旧版本安装的行数缓存触发器和 row_count_cache 表（统计信息直接使用估算行数）
+            try:
+                cursor.execute("""
+                    SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+                    WHERE TRIGGER_SCHEMA = DATABASE()
+                """)
+                existing_triggers = {row['TRIGGER_NAME'] for row in cursor.fetchall()}
+                legacy_triggers = [name for name in self.LEGACY_ROW_COUNT_TRIGGERS if name in existing_triggers]
+                for name in legacy_triggers:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                if legacy_triggers:
+                    self.logger.info(f"已删除 {len(legacy_triggers)} 个旧的行数缓存触发器")
+                cursor.execute("DROP TABLE IF EXISTS row_count_cache")
+            except Exception as e:
+                self.logger.warning(f"删除旧的行数缓存触发器和表失败: {e}")
+            
             connection.commit()
             self.logger.info("数据库表结构初始化完成")
     
-    def insert_or_update_user(self, user_data: Dict[str, Any]):
+    @contextmanager
+    def transaction(self):
+        """
+        在同一个事务中执行多次写入，全部成功后统一提交一次
+
+        用法：
+            with db_manager.transaction() as cursor:
+                db_manager.batch_insert_users(users, cursor=cursor)
+                db_manager.batch_insert_posts(posts, cursor=cursor)
+
+        写入语句不返回行，使用放宽了单条语句长度上限的元组游标（_WriteCursor）
+        """
+        with self.get_cursor(_WriteCursor) as (cursor, connection):
+            yield cursor
+            connection.commit()
+            self.note_mutation()
+
+    @contextmanager
+    def _write_cursor(self, cursor=None):
+        """写入方法使用的游标：传入调用方的游标时复用其事务（由调用方提交），否则单独开启事务并提交"""
+        if cursor is not None:
+            yield cursor
+            return
+        with self.transaction() as cursor:
+            yield cursor
+
+    def insert_or_update_user(self, user_data: Dict[str, Any], cursor=None):
         """插入或忽略用户数据"""
+        if self._is_known_user(user_data.get('id')):
+            return
+        
         # 清理数据
         sanitized_data = self._sanitize_user_data(user_data)
         
@@ -309,154 +697,161 @@ class DatabaseManager:
         if 'first_seen_at' not in sanitized_data:
             sanitized_data['first_seen_at'] = self.get_beijing_time()
         
-        sql = """
-        INSERT IGNORE INTO users (id, username, avatar_url, first_seen_at)
-        VALUES (%(id)s, %(username)s, %(avatar_url)s, %(first_seen_at)s)
-        """
+        with self._write_cursor(cursor) as cur:
+            cur.execute(self.INSERT_USER_SQL, self.USER_PARAMS(sanitized_data))
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, sanitized_data)
-            connection.commit()
+        # 外部事务可能回滚，只有自行提交的写入才记入缓存
+        if cursor is None:
+            self._remember_users([sanitized_data['id']])
     
-    def insert_or_update_topic(self, topic_data: Dict[str, Any]):
+    def insert_or_update_topic(self, topic_data: Dict[str, Any], cursor=None):
         """插入或更新主题数据"""
         # 清理数据
         sanitized_data = self._sanitize_topic_data(topic_data)
         
-        with self.get_cursor() as (cursor, connection):
-            # 如果有作者信息，先插入用户
+        # 如果没有提供抓取时间，使用当前北京时间
+        if 'crawled_at' not in sanitized_data:
+            sanitized_data['crawled_at'] = self.get_beijing_time()
+        
+        with self._write_cursor(cursor) as cur:
+            # 如果有作者信息，先插入用户（满足外键约束，已知存在的用户直接跳过）
             if sanitized_data.get('author_id') and sanitized_data.get('author_username'):
-                user_data = self._sanitize_user_data({
+                self.insert_or_update_user({
                     'id': sanitized_data['author_id'],
-                    'username': sanitized_data['author_username'],
-                    'avatar_url': None,
-                    'first_seen_at': self.get_beijing_time()
-                })
-                user_sql = """
-                INSERT IGNORE INTO users (id, username, avatar_url, first_seen_at)
-                VALUES (%(id)s, %(username)s, %(avatar_url)s, %(first_seen_at)s)
-                """
-                cursor.execute(user_sql, user_data)
-            
-            # 插入或更新主题，使用北京时间作为抓取时间
-            topic_sql = """
-            INSERT INTO topics (id, title, url, category, author_id, reply_count, view_count, 
-                               created_at, last_activity_at, tags, crawled_at)
-            VALUES (%(id)s, %(title)s, %(url)s, %(category)s, %(author_id)s, %(reply_count)s, 
-                    %(view_count)s, %(created_at)s, %(last_activity_at)s, %(tags)s, %(crawled_at)s)
-            ON DUPLICATE KEY UPDATE
-                title = VALUES(title),
-                category = VALUES(category),
-                reply_count = VALUES(reply_count),
-                view_count = VALUES(view_count),
-                last_activity_at = VALUES(last_activity_at),
-                tags = VALUES(tags),
-                crawled_at = %(crawled_at)s
-            """
+                    'username': sanitized_data['author_username']
+                }, cursor=cur)
             
-            # 如果没有提供抓取时间，使用当前北京时间
-            if 'crawled_at' not in sanitized_data:
-                sanitized_data['crawled_at'] = self.get_beijing_time()
-            
-            cursor.execute(topic_sql, sanitized_data)
-            connection.commit()
+            cur.execute(self.UPSERT_TOPIC_SQL, self.TOPIC_PARAMS(sanitized_data))
     
-    def insert_or_update_post(self, post_data: Dict[str, Any]):
+    def insert_or_update_post(self, post_data: Dict[str, Any], cursor=None):
         """插入或更新帖子回复数据"""
         # 清理数据
         sanitized_data = self._sanitize_post_data(post_data)
         
-        sql = """
-        INSERT INTO posts (id, topic_id, user_id, post_number, reply_to_post_number,
-                          content_raw, like_count, created_at)
-        VALUES (%(id)s, %(topic_id)s, %(user_id)s, %(post_number)s, %(reply_to_post_number)s,
-                %(content_raw)s, %(like_count)s, %(created_at)s)
-        ON DUPLICATE KEY UPDATE
-            content_raw = VALUES(content_raw),
-            like_count = VALUES(like_count)
-        """
-        
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, sanitized_data)
-            connection.commit()
+        with self._write_cursor(cursor) as cur:
+            cur.execute(self.UPSERT_POST_SQL, self.POST_PARAMS(sanitized_data))
     
-    def batch_insert_users(self, users_data: List[Dict[str, Any]]):
+    @_with_retry()
+    def batch_insert_users(self, users_data: List[Dict[str, Any]], cursor=None):
         """批量插入用户数据"""
         if not users_data:
             return
         
+        # 跳过已确认存在的用户（INSERT IGNORE 对其不做任何修改）
+        new_users = [u for u in users_data if not self._is_known_user(u.get('id'))]
+        if not new_users:
+            return
+        
         # 清理和验证所有用户数据
         beijing_time = self.get_beijing_time()
-        sanitized_users = []
+        user_rows = []
         
-        for user_data in users_data:
-            sanitized = self._sanitize_user_data(user_data)
+        for user_data in new_users:
+            sanitized = self._sanitize_user_data(user_data, inplace=True)
             if 'first_seen_at' not in sanitized:
                 sanitized['first_seen_at'] = beijing_time
-            sanitized_users.append(sanitized)
+            user_rows.append(self.USER_PARAMS(sanitized))
         
-        sql = """
-        INSERT IGNORE INTO users (id, username, avatar_url, first_seen_at)
-        VALUES (%(id)s, %(username)s, %(avatar_url)s, %(first_seen_at)s)
-        """
+        with self._write_cursor(cursor) as cur:
+            cur.executemany(self.INSERT_USER_SQL, user_rows)
+            self.logger.info(
+                f"批量插入 {len(user_rows)} 个用户（跳过 {len(users_data) - len(new_users)} 个已存在用户）"
+            )
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.executemany(sql, sanitized_users)
-            connection.commit()
-            self.logger.info(f"批量插入 {len(sanitized_users)} 个用户")
+        if cursor is None:
+            self._remember_users([row[0] for row in user_rows])
     
-    def batch_insert_posts(self, posts_data: List[Dict[str, Any]]):
+    @_with_retry()
+    def batch_insert_posts(self, posts_data: List[Dict[str, Any]], cursor=None):
         """批量插入帖子回复数据"""
         if not posts_data:
             return
         
-        # 清理和验证所有帖子数据
-        sanitized_posts = []
-        for post_data in posts_data:
-            sanitized = self._sanitize_post_data(post_data)
-            sanitized_posts.append(sanitized)
+        # 自行提交的大批量写入使用独立连接 LOAD DATA 导入；传入外部事务游标时只能在该事务中写入
+        if cursor is None and len(posts_data) >= self.POST_BULK_LOAD_MIN_ROWS and self._bulk_load_enabled:
+            if self._bulk_load_posts(posts_data):
+                self.logger.info(f"批量导入 {len(posts_data)} 个回复（LOAD DATA）")
+                return
         
-        sql = """
-        INSERT INTO posts (id, topic_id, user_id, post_number, reply_to_post_number,
-                          content_raw, like_count, created_at)
-        VALUES (%(id)s, %(topic_id)s, %(user_id)s, %(post_number)s, %(reply_to_post_number)s,
-                %(content_raw)s, %(like_count)s, %(created_at)s)
-        ON DUPLICATE KEY UPDATE
-            content_raw = VALUES(content_raw),
-            like_count = VALUES(like_count)
+        with self._write_cursor(cursor) as cur:
+            # 边清理边分块写入：每块不超过 POST_CHUNK_ROWS 条、内容总计不超过 POST_CHUNK_MAX_CHARS 字符，
+            # 控制客户端内存和单次请求大小；所有分块在同一事务中提交
+            chunk = []
+            chunk_chars = 0
+            for post_data in posts_data:
+                sanitized = self._sanitize_post_data(post_data, inplace=True)
+                chunk.append(self.POST_PARAMS(sanitized))
+                chunk_chars += len(sanitized.get('content_raw') or '')
+                if len(chunk) >= self.POST_CHUNK_ROWS or chunk_chars >= self.POST_CHUNK_MAX_CHARS:
+                    cur.executemany(self.UPSERT_POST_SQL, chunk)
+                    chunk = []
+                    chunk_chars = 0
+            if chunk:
+                cur.executemany(self.UPSERT_POST_SQL, chunk)
+            self.logger.info(f"批量插入 {len(posts_data)} 个回复")
+    
+    def _bulk_load_posts(self, posts_data: List[Dict[str, Any]]) -> bool:
         """
-        
-        with self.get_cursor() as (cursor, connection):
-            cursor.executemany(sql, sanitized_posts)
+        清理回复数据后写入临时文件，通过 LOAD DATA LOCAL INFILE 导入临时表后合并进 posts，单独提交
+
+        只有这里使用的独立非连接池连接开启 local_infile（允许服务端读取客户端文件），用完即断开。
+        服务端禁用本地文件导入时记录并返回 False，由调用方回退到 executemany；其他错误照常抛出
+        """
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as f:
+            path = f.name
+            for post_data in posts_data:
+                sanitized = self._sanitize_post_data(post_data, inplace=True)
+                f.write('\t'.join(map(_tsv_field, self.POST_PARAMS(sanitized))))
+                f.write('\n')
+        connection = None
+        try:
+            connection = pymysql.connect(**self._get_connect_kwargs(), local_infile=True)
+            with connection.cursor() as cursor:
+                cursor.execute(self.CREATE_POST_STAGE_SQL)
+                cursor.execute(self.LOAD_POST_STAGE_SQL, (path,))
+                cursor.execute(self.MERGE_POST_STAGE_SQL)
             connection.commit()
-            self.logger.info(f"批量插入 {len(sanitized_posts)} 个回复")
+            self.note_mutation()
+            return True
+        except pymysql.err.MySQLError as e:
+            if not (e.args and e.args[0] in _LOCAL_INFILE_DISABLED_CODES):
+                raise
+            self._bulk_load_enabled = False
+            self.logger.warning(f"服务端未启用 LOAD DATA LOCAL INFILE，回复改用批量 INSERT 写入: {e}")
+            return False
+        finally:
+            # 断开连接即丢弃临时表和未提交的事务
+            if connection:
+                connection.close()
+            os.unlink(path)
     
     def get_topic_last_activity(self, topic_id: int) -> Optional[datetime]:
         """获取主题的最后活跃时间"""
-        sql = "SELECT last_activity_at FROM topics WHERE id = %s"
-        
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, (topic_id,))
+        with self.get_tuple_cursor(readonly=True) as (cursor, connection):
+            cursor.execute(self.LAST_ACTIVITY_SQL, (topic_id,))
             result = cursor.fetchone()
-            return result['last_activity_at'] if result else None
+            return result[0] if result else None
     
     def get_topics_last_activity_batch(self, topic_ids: List[int]) -> Dict[int, datetime]:
         """批量获取多个主题的最后活跃时间"""
         if not topic_ids:
             return {}
         
-        # 构建IN查询
-        placeholders = ','.join(['%s'] * len(topic_ids))
-        sql = f"SELECT id, last_activity_at FROM topics WHERE id IN ({placeholders})"
-        
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, topic_ids)
-            results = cursor.fetchall()
-            
-            # 转换为字典格式
-            return {row['id']: row['last_activity_at'] for row in results}
+        # 按主键 IN 查询，按 ID_CHUNK_SIZE 分批控制语句长度
+        result = {}
+        with self.get_tuple_cursor(readonly=True) as (cursor, connection):
+            for start in range(0, len(topic_ids), self.ID_CHUNK_SIZE):
+                chunk = topic_ids[start:start + self.ID_CHUNK_SIZE]
+                placeholders = _placeholders(len(chunk))
+                cursor.execute(f"SELECT id, last_activity_at FROM topics WHERE id IN ({placeholders})", chunk)
+                
+                # 元组行 (id, last_activity_at) 直接写入字典，不再逐行构造行字典
+                # （连接池返回的游标包装对象不支持迭代，需通过 fetchall 取行）
+                result.update(cursor.fetchall())
+        return result
     
-    def batch_insert_or_update_topics(self, topics_data: List[Dict[str, Any]]):
+    @_with_retry()
+    def batch_insert_or_update_topics(self, topics_data: List[Dict[str, Any]], cursor=None):
         """批量插入或更新主题信息"""
         if not topics_data:
             return
@@ -469,80 +864,155 @@ class DatabaseManager:
             sanitized = self._sanitize_topic_data(topic_data)
             if 'crawled_at' not in sanitized:
                 sanitized['crawled_at'] = beijing_time
-            sanitized_topics.append(sanitized)
-        
-        sql = """
-        INSERT INTO topics (
-            id, title, url, category, author_id, 
-            reply_count, view_count, last_activity_at, created_at, tags, crawled_at
-        ) VALUES (
-            %(id)s, %(title)s, %(url)s, %(category)s, %(author_id)s,
-            %(reply_count)s, %(view_count)s, %(last_activity_at)s, %(created_at)s, %(tags)s, %(crawled_at)s
-        ) ON DUPLICATE KEY UPDATE
-            title = VALUES(title),
-            url = VALUES(url),
-            category = VALUES(category),
-            author_id = VALUES(author_id),
-            reply_count = VALUES(reply_count),
-            view_count = VALUES(view_count),
-            last_activity_at = VALUES(last_activity_at),
-            tags = VALUES(tags),
-            crawled_at = VALUES(crawled_at)
-        """
+            sanitized_topics.append(self.TOPIC_PARAMS(sanitized))
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.executemany(sql, sanitized_topics)
-            connection.commit()
+        with self._write_cursor(cursor) as cur:
+            cur.executemany(self.BATCH_UPSERT_TOPICS_SQL, sanitized_topics)
             self.logger.info(f"批量插入/更新 {len(sanitized_topics)} 个主题")
     
-    def clean_old_data(self, retention_days: int) -> int:
-        """清理过期数据"""
-        sql = """
-        DELETE FROM topics 
-        WHERE last_activity_at < DATE_SUB(CURRENT_TIMESTAMP, INTERVAL %s DAY)
-        """
+    @_with_retry()
+    def batch_upsert_topic_details(self, topics_data: List[Dict[str, Any]], cursor=None):
+        """批量写入详情页解析出的主题信息（与 insert_or_update_topic 相同，不覆盖已有主题的 url 和 author_id）"""
+        if not topics_data:
+            return
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, (retention_days,))
-            deleted_count = cursor.rowcount
-            connection.commit()
-            self.logger.info(f"清理了 {deleted_count} 个过期主题及其相关数据")
-            return deleted_count
+        beijing_time = self.get_beijing_time()
+        sanitized_topics = []
+        
+        for topic_data in topics_data:
+            sanitized = self._sanitize_topic_data(topic_data)
+            if 'crawled_at' not in sanitized:
+                sanitized['crawled_at'] = beijing_time
+            sanitized_topics.append(self.TOPIC_PARAMS(sanitized))
+        
+        with self._write_cursor(cursor) as cur:
+            cur.executemany(self.UPSERT_TOPIC_SQL, sanitized_topics)
+            self.logger.info(f"批量更新 {len(sanitized_topics)} 个主题详情")
+    
+    def clean_old_data(self, cutoff_ts: datetime) -> int:
+        """
+        清理最后活跃时间早于 cutoff_ts（北京时间）的过期数据
+
+        按 CLEANUP_BATCH_SIZE 分批处理并逐批提交：先查出一批过期主题ID，按ID批量删除其回复，
+        再删除主题本身，避免依赖外键级联逐行删除回复（查询时锁定这批主题，防止删除前被重新更新）。
+        同一连接使用超过 CONNECTION_RECYCLE_SECONDS 秒，或单批删除速率降到该连接首批速率的一半以下时，
+        关闭并重建连接，避免长时间清理越跑越慢；遇到临时错误时同样重建连接，从未提交的批次继续
+        """
+        select_sql = """
+        SELECT id FROM topics 
+        WHERE last_activity_at < %s
+        LIMIT %s
+        FOR UPDATE
+        """
+
+        deleted_count = 0
+        batch_count = 0
+        recycle_count = 0
+        error_count = 0
+        finished = False
+        while not finished:
+            try:
+                # 使用非连接池连接，退出上下文时真正断开，下一轮重新建立连接
+                with self.get_cursor(pymysql.cursors.Cursor, pooled=False) as (cursor, connection):
+                    connection_start = time.monotonic()
+                    initial_rate = None
+                    while True:
+                        batch_start = time.monotonic()
+                        cursor.execute(select_sql, (cutoff_ts, self.CLEANUP_BATCH_SIZE))
+                        topic_ids = [row[0] for row in cursor.fetchall()]
+                        if not topic_ids:
+                            finished = True
+                            break
+
+                        placeholders = _placeholders(len(topic_ids))
+                        cursor.execute(f"DELETE FROM posts WHERE topic_id IN ({placeholders})", topic_ids)
+                        cursor.execute(f"DELETE FROM topics WHERE id IN ({placeholders})", topic_ids)
+                        batch_deleted = cursor.rowcount
+                        connection.commit()
+                        self.note_mutation()
+                        deleted_count += batch_deleted
+                        batch_count += 1
+
+                        if len(topic_ids) < self.CLEANUP_BATCH_SIZE:
+                            finished = True
+                            break
+
+                        now = time.monotonic()
+                        rate = batch_deleted / max(now - batch_start, 1e-6)
+                        if initial_rate is None:
+                            initial_rate = rate
+                        if now - connection_start >= self.CONNECTION_RECYCLE_SECONDS or rate < initial_rate / 2:
+                            recycle_count += 1
+                            self.logger.info(
+                                f"已删除 {deleted_count} 个过期主题，重建数据库连接后继续清理"
+                                f"（当前速率 {rate:.0f} 行/秒，首批速率 {initial_rate:.0f} 行/秒）"
+                            )
+                            break
+            except Exception as e:
+                # 临时错误：已提交的批次不受影响，重建连接后从下一批继续
+                if not _is_transient_error(e) or error_count >= self.CLEANUP_MAX_RETRIES:
+                    raise
+                error_count += 1
+                self.logger.warning(f"清理过期数据遇到临时数据库错误，重建连接后继续 ({error_count}/{self.CLEANUP_MAX_RETRIES}): {e}")
+                time.sleep(0.05 * 2 ** (error_count - 1))
+
+        self.logger.info(
+            f"清理了 {deleted_count} 个过期主题及其相关数据（共 {batch_count} 批，重建连接 {recycle_count} 次）"
+        )
+        return deleted_count
     
+    @_with_retry()
     def update_total_likes(self, topic_ids: List[int] = None) -> int:
-        """更新主题的总点赞数"""
+        """
+        更新主题的总点赞数
+
+        先对posts按topic_id分组聚合一次，再与topics做连接更新，
+        避免相关子查询对每个主题单独扫描posts。
+        指定主题时按 ID_CHUNK_SIZE 分批执行，控制IN列表长度，所有批次在同一事务中提交。
+        """
         if topic_ids is None:
             # 更新所有主题
             sql = """
-            UPDATE topics t SET total_like_count = (
-                SELECT COALESCE(SUM(p.like_count), 0)
-                FROM posts p 
-                WHERE p.topic_id = t.id
-            )
+            UPDATE topics t
+            LEFT JOIN (
+                SELECT topic_id, SUM(like_count) AS like_sum
+                FROM posts
+                GROUP BY topic_id
+            ) p ON p.topic_id = t.id
+            SET t.total_like_count = COALESCE(p.like_sum, 0)
             """
-            params = None
+            batches = [(sql, None)]
         else:
             # 更新指定主题
             if not topic_ids:
                 return 0
-            placeholders = ','.join(['%s'] * len(topic_ids))
-            sql = f"""
-            UPDATE topics t SET total_like_count = (
-                SELECT COALESCE(SUM(p.like_count), 0)
-                FROM posts p 
-                WHERE p.topic_id = t.id
-            )
-            WHERE t.id IN ({placeholders})
-            """
-            params = topic_ids
+            batches = []
+            for start in range(0, len(topic_ids), self.ID_CHUNK_SIZE):
+                chunk = tuple(topic_ids[start:start + self.ID_CHUNK_SIZE])
+                placeholders = _placeholders(len(chunk))
+                sql = f"""
+                UPDATE topics t
+                LEFT JOIN (
+                    SELECT topic_id, SUM(like_count) AS like_sum
+                    FROM posts
+                    WHERE topic_id IN ({placeholders})
+                    GROUP BY topic_id
+                ) p ON p.topic_id = t.id
+                SET t.total_like_count = COALESCE(p.like_sum, 0)
+                WHERE t.id IN ({placeholders})
+                """
+                batches.append((sql, chunk + chunk))
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, params)
-            updated_count = cursor.rowcount
+        with self.get_tuple_cursor() as (cursor, connection):
+            updated_count = 0
+            for sql, params in batches:
+                cursor.execute(sql, params)
+                updated_count += cursor.rowcount
             connection.commit()
             self.logger.info(f"更新了 {updated_count} 个主题的总点赞数")
             return updated_count
     
+    @_with_retry()
     def update_hotness_scores(self, topic_ids: List[int] = None, 
                             view_weight: float = 1.0, 
                             reply_weight: float = 5.0, 
@@ -558,38 +1028,99 @@ class DatabaseManager:
         时间衰减因子: max(0.1, 1 - (当前时间 - 最后活跃时间) / time_decay_hours)
         数值范围控制: 结果被限制在 [0.1, max_score] 范围内
         """
+        inv_decay_hours = 1.0 / time_decay_hours
         if topic_ids is None:
             # 更新所有主题
             sql = f"""
             UPDATE topics 
-            SET hotness_score = LEAST(%s, GREATEST(0.1,
-                (view_count * %s + reply_count * %s + total_like_count * %s) *
-                GREATEST(0.1, 1 - TIMESTAMPDIFF(HOUR, last_activity_at, NOW()) / %s)
-            ))
+            {self.HOTNESS_SET_CLAUSE}
             """
-            params = (max_score, view_weight, reply_weight, like_weight, time_decay_hours)
+            params = (max_score, view_weight, reply_weight, like_weight, inv_decay_hours)
         else:
             # 更新指定主题
             if not topic_ids:
                 return 0
-            placeholders = ','.join(['%s'] * len(topic_ids))
+            placeholders = _placeholders(len(topic_ids))
             sql = f"""
             UPDATE topics 
-            SET hotness_score = LEAST(%s, GREATEST(0.1,
-                (view_count * %s + reply_count * %s + total_like_count * %s) *
-                GREATEST(0.1, 1 - TIMESTAMPDIFF(HOUR, last_activity_at, NOW()) / %s)
-            ))
+            {self.HOTNESS_SET_CLAUSE}
             WHERE id IN ({placeholders})
             """
-            params = (max_score, view_weight, reply_weight, like_weight, time_decay_hours) + tuple(topic_ids)
+            params = (max_score, view_weight, reply_weight, like_weight, inv_decay_hours) + tuple(topic_ids)
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_tuple_cursor() as (cursor, connection):
             cursor.execute(sql, params)
             updated_count = cursor.rowcount
             connection.commit()
             self.logger.info(f"更新了 {updated_count} 个主题的热度分数（最大值限制: {max_score}）")
             return updated_count
-    
+
+    def analyze_recent_topics(self, hours_back: int = 24,
+                              view_weight: float = 1.0,
+                              reply_weight: float = 5.0,
+                              like_weight: float = 3.0,
+                              time_decay_hours: int = 168,
+                              max_score: float = 999999.0) -> Dict[str, int]:
+        """
+        在单个事务中分析最近活跃的主题：选出主题ID、更新总点赞数并更新热度分数
+
+        选取主题ID时使用普通的非锁定读，不会跳过爬虫正在写入的主题；
+        后续按ID分块执行的 UPDATE 对命中的行加锁，锁在事务提交时释放。
+
+        Returns:
+            {'analyzed_topics': 主题数, 'updated_likes': 更新点赞数的主题数, 'updated_scores': 更新热度的主题数}
+        """
+        select_sql = """
+        SELECT id FROM topics
+        WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+           OR last_activity_at >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+        ORDER BY id
+        """
+
+        inv_decay_hours = 1.0 / time_decay_hours
+
+        with self.get_tuple_cursor() as (cursor, connection):
+            cursor.execute(select_sql, (hours_back, hours_back))
+            topic_ids = [row[0] for row in cursor.fetchall()]
+            if not topic_ids:
+                connection.commit()
+                return {'analyzed_topics': 0, 'updated_likes': 0, 'updated_scores': 0}
+
+            updated_likes = 0
+            updated_scores = 0
+            for start in range(0, len(topic_ids), self.ID_CHUNK_SIZE):
+                chunk = tuple(topic_ids[start:start + self.ID_CHUNK_SIZE])
+                placeholders = _placeholders(len(chunk))
+
+                cursor.execute(f"""
+                UPDATE topics t
+                LEFT JOIN (
+                    SELECT topic_id, SUM(like_count) AS like_sum
+                    FROM posts
+                    WHERE topic_id IN ({placeholders})
+                    GROUP BY topic_id
+                ) p ON p.topic_id = t.id
+                SET t.total_like_count = COALESCE(p.like_sum, 0)
+                WHERE t.id IN ({placeholders})
+                """, chunk + chunk)
+                updated_likes += cursor.rowcount
+
+                cursor.execute(f"""
+                UPDATE topics
+                {self.HOTNESS_SET_CLAUSE}
+                WHERE id IN ({placeholders})
+                """, (max_score, view_weight, reply_weight, like_weight, inv_decay_hours) + chunk)
+                updated_scores += cursor.rowcount
+
+            connection.commit()
+            self.logger.info(f"最近 {hours_back} 小时分析完成: {len(topic_ids)} 个主题，"
+                             f"更新点赞数 {updated_likes}，更新热度分数 {updated_scores}")
+            return {
+                'analyzed_topics': len(topic_ids),
+                'updated_likes': updated_likes,
+                'updated_scores': updated_scores
+            }
+
     def get_hot_topics_by_category(self, category: str, limit: int = 30, 
                                   hours_back: int = 24) -> List[Dict[str, Any]]:
         """获取指定分类在指定时间内的热门主题"""
@@ -604,7 +1135,7 @@ class DatabaseManager:
         LIMIT %s
         """
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             cursor.execute(sql, (category, hours_back, hours_back, limit))
             return cursor.fetchall()
     
@@ -625,7 +1156,7 @@ class DatabaseManager:
         ORDER BY hotness_score DESC
         """
 
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             if limit is None:
                 # 不限制数量，返回所有结果
                 cursor.execute(base_sql, (hours_back,))
@@ -695,7 +1226,7 @@ class DatabaseManager:
         LIMIT %s
         """
 
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             cursor.execute(sql, (
                 hotness_weight,           # 热度权重
                 engagement_weight,        # 互动价值权重
@@ -718,7 +1249,7 @@ class DatabaseManager:
         ORDER BY last_activity_at DESC
         """
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             cursor.execute(sql, (hours_back, hours_back))
             return cursor.fetchall()
     
@@ -747,7 +1278,7 @@ class DatabaseManager:
         LIMIT %s
         """
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             # 获取主题信息
             cursor.execute(topic_sql, (topic_id,))
             topic = cursor.fetchone()
@@ -769,16 +1300,20 @@ class DatabaseManager:
             }
     
     def save_report(self, report_data: Dict[str, Any]) -> int:
-        """保存分析报告到数据库"""
+        """保存分析报告到数据库（报告内容在客户端 zlib 压缩后写入 report_content_z）"""
         sql = """
         INSERT INTO reports (category, report_type, analysis_period_start, analysis_period_end,
-                           topics_analyzed, report_title, report_content)
+                           topics_analyzed, report_title, report_content, report_content_z)
         VALUES (%(category)s, %(report_type)s, %(analysis_period_start)s, %(analysis_period_end)s,
-                %(topics_analyzed)s, %(report_title)s, %(report_content)s)
+                %(topics_analyzed)s, %(report_title)s, '', %(report_content_z)s)
         """
+        params = {
+            **report_data,
+            'report_content_z': zlib.compress(report_data['report_content'].encode('utf-8'), _REPORT_COMPRESS_LEVEL)
+        }
         
-        with self.get_cursor() as (cursor, connection):
-            cursor.execute(sql, report_data)
+        with self.get_tuple_cursor() as (cursor, connection):
+            cursor.execute(sql, params)
             report_id = cursor.lastrowid
             connection.commit()
             self.logger.info(f"保存报告成功，ID: {report_id}")
@@ -806,7 +1341,7 @@ class DatabaseManager:
             """
             params = (limit,)
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             cursor.execute(sql, params)
             return cursor.fetchall()
     
@@ -814,14 +1349,22 @@ class DatabaseManager:
         """获取完整的报告内容"""
         sql = """
         SELECT id, category, report_type, analysis_period_start, analysis_period_end,
-               topics_analyzed, report_title, report_content, generated_at
+               topics_analyzed, report_title, report_content, report_content_z, generated_at
         FROM reports 
         WHERE id = %s
         """
         
-        with self.get_cursor() as (cursor, connection):
+        with self.get_ro_cursor() as (cursor, connection):
             cursor.execute(sql, (report_id,))
-            return cursor.fetchone()
+            row = cursor.fetchone()
+        
+        if row is None:
+            return None
+        # 压缩存储的报告解压到 report_content，未压缩的旧报告直接返回原内容
+        compressed = row.pop('report_content_z')
+        if compressed is not None:
+            row['report_content'] = zlib.decompress(compressed).decode('utf-8')
+        return row
 
 
 # 全局数据库管理实例
@@ -4,7 +4,7 @@ HTML到Markdown转换模块
 """
 import re
 import html
-from typing import Optional
+from typing import List, Optional
 import logging
 
 
@@ -141,4 +141,9 @@ class HTMLToMarkdownConverter:
 
 
 # 全局转换器实例
-html_to_markdown = HTMLToMarkdownConverter()
\ No newline at end of file
+html_to_markdown = HTMLToMarkdownConverter()
+
+
+def convert_html_list(html_list: List[str]) -> List[str]:
+    """批量将HTML转换为Markdown（模块级函数，可被进程池序列化调用）"""
+    return [html_to_markdown.convert(html_content) for html_content in html_list]
@@ -6,11 +6,7 @@ import time
 from typing import Dict, Any, Optional
 from openai import OpenAI
 
-try:
-    from .config import config
-except ImportError:
-    # 当作脚本直接运行时的导入
-    from config import config
+from .config import config
 
 
 class LLMClient:
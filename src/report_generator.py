@@ -5,6 +5,7 @@
 import logging
 import asyncio
 import concurrent.futures
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 
@@ -27,6 +28,8 @@ class ReportGenerator:
         self.top_replies_per_topic = 10
         # 增加内容长度限制以容纳更多主题
         self.max_content_length = config.get_llm_config().get('max_content_length', 50000)
+        # 保护主题详情缓存的"查询-登记"操作，保证同一主题只由一个线程查询
+        self._topic_cache_lock = threading.Lock()
     
     def get_beijing_time(self) -> datetime:
         """获取当前北京时间"""
@@ -320,8 +323,19 @@ class ReportGenerator:
 
         return enhanced_report
 
-    async def generate_category_report(self, category: str = None, hours_back: int = 24) -> Dict[str, Any]:
-        """生成热点分析报告（不再按分类筛选，从所有数据中获取热门主题）"""
+    async def generate_category_report(
+        self,
+        category: str = None,
+        hours_back: int = 24,
+        topic_detail_cache: Optional[Dict[int, concurrent.futures.Future]] = None
+    ) -> Dict[str, Any]:
+        """生成热点分析报告（不再按分类筛选，从所有数据中获取热门主题）
+
+        Args:
+            category: 板块分类，None表示全站
+            hours_back: 回溯小时数
+            topic_detail_cache: 本次运行内共享的主题详情缓存（topic_id -> 详情查询的 Future），None表示不缓存
+        """
         try:
             report_title = "全站热点分析报告" if category is None else f"{category} 板块热点分析报告"
             self.logger.info(f"开始生成 {report_title} (回溯 {hours_back} 小时)")
@@ -364,7 +378,8 @@ class ReportGenerator:
                         self._fetch_topic_detail_sync,
                         index,
                         total_topics,
-                        topic
+                        topic,
+                        topic_detail_cache
                     )
                     for index, topic in enumerate(hot_topics, 1)
                 ]
@@ -550,11 +565,16 @@ class ReportGenerator:
                 'reports': []
             }
 
-    async def generate_light_report(self, hours_back: int = 24) -> Dict[str, Any]:
+    async def generate_light_report(
+        self,
+        hours_back: int = 24,
+        topic_detail_cache: Optional[Dict[int, concurrent.futures.Future]] = None
+    ) -> Dict[str, Any]:
         """生成日报资讯报告(智能筛选最有价值的主题)
 
         Args:
             hours_back: 回溯小时数,默认24小时
+            topic_detail_cache: 本次运行内共享的主题详情缓存,None表示不缓存
 
         Returns:
             报告生成结果
@@ -620,7 +640,8 @@ class ReportGenerator:
                         self._fetch_topic_detail_sync,
                         index,
                         total_topics,
-                        topic
+                        topic,
+                        topic_detail_cache
                     )
                     for index, topic in enumerate(hot_topics, 1)
                 ]
@@ -763,19 +784,28 @@ class ReportGenerator:
                 'topics_analyzed': 0
             }
 
-    async def generate_deep_report(self, hours_back: int = 24) -> Dict[str, Any]:
+    async def generate_deep_report(
+        self,
+        hours_back: int = 24,
+        topic_detail_cache: Optional[Dict[int, concurrent.futures.Future]] = None
+    ) -> Dict[str, Any]:
         """生成深度洞察报告(热点主题深度分析)
 
         这是对现有 generate_category_report 的包装,提供统一的双轨制接口
 
         Args:
             hours_back: 回溯小时数,默认24小时
+            topic_detail_cache: 本次运行内共享的主题详情缓存,None表示不缓存
 
         Returns:
             报告生成结果
         """
         self.logger.info(f"开始生成深度洞察报告 (回溯 {hours_back} 小时)")
-        result = await self.generate_category_report(category=None, hours_back=hours_back)
+        result = await self.generate_category_report(
+            category=None,
+            hours_back=hours_back,
+            topic_detail_cache=topic_detail_cache
+        )
 
         # 添加报告类型标识
         if result.get('success'):
@@ -786,7 +816,7 @@ class ReportGenerator:
     async def run_dual_report_generation(self, hours_back: int = 24) -> Dict[str, Any]:
         """双轨制报告生成总调度器
 
-        依次生成日报资讯和深度洞察报告
+        并发生成日报资讯和深度洞察报告（两轨互不依赖，均为I/O密集型）
 
         Args:
             hours_back: 回溯小时数,默认24小时
@@ -799,13 +829,24 @@ class ReportGenerator:
             self.logger.info(f"开始双轨制报告生成 (回溯 {hours_back} 小时)")
             self.logger.info(f"=" * 80)
 
-            # 生成日报资讯
+            # 并发生成日报资讯和深度洞察报告
             self.logger.info(">>> 第1轨: 开始生成日报资讯报告")
-            light_result = await self.generate_light_report(hours_back=hours_back)
-
-            # 生成深度洞察报告
             self.logger.info(">>> 第2轨: 开始生成深度洞察报告")
-            deep_result = await self.generate_deep_report(hours_back=hours_back)
+            # 两轨筛选出的主题高度重叠，共享本次运行内的主题详情缓存，避免重复查询
+            # （两轨并发执行，缓存中保存进行中的查询，另一轨同时命中时等待其结果）
+            topic_detail_cache: Dict[int, concurrent.futures.Future] = {}
+            light_result, deep_result = await asyncio.gather(
+                self.generate_light_report(hours_back=hours_back, topic_detail_cache=topic_detail_cache),
+                self.generate_deep_report(hours_back=hours_back, topic_detail_cache=topic_detail_cache),
+                return_exceptions=True
+            )
+
+            if isinstance(light_result, Exception):
+                self.logger.error(f"日报资讯生成时出现未处理异常: {light_result}")
+                light_result = {'success': False, 'error': str(light_result), 'report_type': 'light', 'topics_analyzed': 0}
+            if isinstance(deep_result, Exception):
+                self.logger.error(f"深度洞察生成时出现未处理异常: {deep_result}")
+                deep_result = {'success': False, 'error': str(deep_result), 'report_type': 'deep', 'topics_analyzed': 0}
 
             # 汇总结果
             overall_success = light_result.get('success', False) or deep_result.get('success', False)
@@ -872,12 +913,24 @@ class ReportGenerator:
         self,
         index: int,
         total: int,
-        topic: Dict[str, Any]
+        topic: Dict[str, Any],
+        topic_detail_cache: Optional[Dict[int, concurrent.futures.Future]] = None
     ) -> Tuple[int, Optional[Dict[str, Any]]]:
         """在线程池中获取单个主题的详细数据，返回其索引以便还原顺序"""
 
         title = topic.get('title', '未知标题')
         preview = f"{title[:50]}..." if title and len(title) > 50 else title
+
+        pending = None
+        if topic_detail_cache is not None:
+            with self._topic_cache_lock:
+                cached = topic_detail_cache.get(topic['id'])
+                if cached is None:
+                    # 由当前线程负责查询，登记进行中的结果供另一轨等待
+                    pending = topic_detail_cache[topic['id']] = concurrent.futures.Future()
+            if cached is not None:
+                self.logger.info(f"第 {index}/{total} 个主题命中详情缓存: {preview}")
+                return index, cached.result()
         self.logger.info(f"获取第 {index}/{total} 个主题详细数据: {preview}")
 
         topic_data = None
@@ -888,8 +941,12 @@ class ReportGenerator:
             )
         except Exception as exc:
             self.logger.warning(f"主题 {index}/{total} 数据获取失败: {exc}")
+            if pending is not None:
+                pending.set_exception(exc)
             raise
 
+        if pending is not None:
+            pending.set_result(topic_data)
         if topic_data:
             self.logger.info(f"主题 {index}/{total} 数据获取成功")
         else:
@@ -32,7 +32,7 @@ class TaskScheduler:
             try:
                 from .concurrent_crawler import ConcurrentCrawler
             except ImportError as e:
-                error_msg = f"无法导入爬虫模块：{e}。请确保已安装 curl_cffi: pip install curl_cffi"
+                error_msg = f"无法导入爬虫模块：{e}。请确保已安装爬虫依赖: pip install -r requirements-crawler.txt"
                 self.logger.error(error_msg)
                 return {
                     'success': False,
@@ -57,11 +57,11 @@ class TaskScheduler:
                 crawler = ConcurrentCrawler(max_concurrent_boards=1, max_concurrent_pages=1, max_concurrent_details=1)
                 mode_name = "串行"
             
-            # 步骤1: 爬取主题列表
-            self.logger.info(f"步骤1: {mode_name}爬取主题列表...")
-            topics_to_crawl = await crawler.crawl_all_topic_lists()
+            # 主题列表与详情以流水线方式爬取：每批主题判断完成后立即开始爬取其详情
+            self.logger.info(f"{mode_name}爬取主题列表，并流水线爬取需要更新的主题详情...")
+            success_count, total_count = await crawler.crawl_topics_pipelined()
             
-            if not topics_to_crawl:
+            if not total_count:
                 self.logger.info("没有需要更新的主题")
                 log_task_end(task_name, start_time, topics_found=0)
                 return {
@@ -71,18 +71,14 @@ class TaskScheduler:
                     'message': '没有需要更新的主题'
                 }
             
-            # 步骤2: 爬取主题详情
-            self.logger.info(f"步骤2: {mode_name}爬取 {len(topics_to_crawl)} 个主题详情...")
-            success_count, total_count = await crawler.crawl_topics_details_concurrent(topics_to_crawl)
-            
             # 记录任务完成
             log_task_end(task_name, start_time, 
-                        topics_found=len(topics_to_crawl),
+                        topics_found=total_count,
                         topics_crawled=success_count)
             
             return {
                 'success': True,
-                'topics_found': len(topics_to_crawl),
+                'topics_found': total_count,
                 'topics_crawled': success_count,
                 'success_rate': f"{success_count}/{total_count}",
                 'concurrent_mode': use_concurrent
@@ -104,8 +100,8 @@ class TaskScheduler:
             # 初始化数据库（确保表结构存在）
             self.logger.info("初始化数据库...")
             db_manager.init_database()
-            # 获取清理前的统计信息
-            stats_before = data_cleaner.get_database_stats()
+            # 获取清理前的统计信息（清理前后需要对比，使用精确计数）
+            stats_before = data_cleaner.get_database_stats(exact=True)
             self.logger.info(f"清理前统计: {stats_before}")
             
             # 执行数据清理
@@ -115,7 +111,7 @@ class TaskScheduler:
             orphan_result = data_cleaner.cleanup_orphaned_data()
             
             # 获取清理后的统计信息
-            stats_after = data_cleaner.get_database_stats()
+            stats_after = data_cleaner.get_database_stats(exact=True)
             self.logger.info(f"清理后统计: {stats_after}")
             
             log_task_end(task_name, start_time,
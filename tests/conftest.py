@@ -0,0 +1,11 @@
+"""
+测试公共配置
+"""
+import os
+import sys
+
+# 导入 src 包时会读取数据库配置，测试不连接真实数据库，只需提供占位配置
+for _name in ('DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME'):
+    os.environ.setdefault(_name, 'test')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
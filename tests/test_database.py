@@ -0,0 +1,195 @@
+"""
+数据库模块测试（不连接真实数据库）
+"""
+import os
+from datetime import datetime
+
+import pymysql
+import pytest
+
+pytest.importorskip('dbutils.pooled_db')
+
+from src import database
+from src.database import DatabaseManager
+
+
+def _offline_connection() -> pymysql.connections.Connection:
+    """不建立网络连接的 PyMySQL 连接，可用于生成转义后的SQL"""
+    connection = pymysql.connections.Connection(host='localhost', charset='utf8mb4', defer_connect=True)
+    connection.server_status = 0
+    return connection
+
+
+class _FakePooledConnection:
+    """模拟连接池返回的连接：cursor() 创建真实的 PyMySQL 游标，提交/回滚/关闭不做任何事"""
+
+    def __init__(self):
+        self.raw = _offline_connection()
+
+    def cursor(self, cursor_class):
+        return cursor_class(self.raw)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _capture_queries(cursor) -> list:
+    """记录游标发送的SQL，替代网络发送"""
+    sent = []
+
+    def query(sql):
+        sent.append(sql)
+        return 0
+
+    cursor._query = query
+    return sent
+
+
+def test_write_cursor_raises_executemany_statement_length():
+    cursor = _offline_connection().cursor(database._WriteCursor)
+    default_cursor = _offline_connection().cursor(pymysql.cursors.Cursor)
+    assert cursor.max_stmt_length == database._WRITE_MAX_STMT_LENGTH
+    assert cursor.max_stmt_length > default_cursor.max_stmt_length
+
+    sql = "INSERT INTO t (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = VALUES(b)"
+    rows = [(i, 'x' * 1000) for i in range(3000)]
+    sent = _capture_queries(cursor)
+    default_sent = _capture_queries(default_cursor)
+    cursor.executemany(sql, rows)
+    default_cursor.executemany(sql, rows)
+
+    assert len(sent) < len(default_sent)
+    assert all(len(statement) <= database._WRITE_MAX_STMT_LENGTH for statement in sent)
+
+
+def test_transaction_yields_write_cursor(monkeypatch):
+    manager = DatabaseManager()
+    monkeypatch.setattr(manager, 'get_connection', lambda pooled=True, readonly=False: _FakePooledConnection())
+
+    with manager.transaction() as cursor:
+        assert isinstance(cursor, database._WriteCursor)
+        assert cursor.max_stmt_length == database._WRITE_MAX_STMT_LENGTH
+
+
+class _SteadyCursorLike:
+    """与 DBUtils SteadyDBCursor 一致：普通属性通过 __getattr__ 转发，不支持迭代"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _LastActivityCursor:
+    """按 IN 参数返回 (id, last_activity_at) 行的游标"""
+
+    def __init__(self, executed: list):
+        self.executed = executed
+        self._rows = []
+
+    def execute(self, sql, args=None):
+        self.executed.append(list(args))
+        self._rows = [(topic_id, f"ts-{topic_id}") for topic_id in args]
+
+    def fetchall(self):
+        return tuple(self._rows)
+
+    def close(self):
+        pass
+
+
+def test_topics_last_activity_batch_reads_through_pooled_cursor(monkeypatch):
+    manager = DatabaseManager()
+    monkeypatch.setattr(manager, 'ID_CHUNK_SIZE', 2)
+    executed = []
+
+    class Connection(_FakePooledConnection):
+        def cursor(self, cursor_class):
+            return _SteadyCursorLike(_LastActivityCursor(executed))
+
+    monkeypatch.setattr(manager, 'get_connection', lambda pooled=True, readonly=False: Connection())
+
+    result = manager.get_topics_last_activity_batch([1, 2, 3, 4, 5])
+
+    assert executed == [[1, 2], [3, 4], [5]]
+    assert result == {topic_id: f"ts-{topic_id}" for topic_id in (1, 2, 3, 4, 5)}
+
+
+@pytest.mark.skipif(os.getenv('TEST_MYSQL') != '1',
+                    reason='需要 TEST_MYSQL=1，且 DB_* 环境变量指向可写入的测试数据库（服务端开启 local_infile）')
+def test_bulk_load_matches_executemany_for_duplicate_posts(monkeypatch):
+    manager = DatabaseManager()
+    manager.init_database()
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+    user_id = 990001
+    topic_ids = {'executemany': 990001, 'bulk': 990002}
+
+    def post(topic_id, offset, post_number, content, like_count):
+        return {
+            'id': topic_id * 10 + offset, 'topic_id': topic_id, 'user_id': user_id,
+            'post_number': post_number, 'reply_to_post_number': None,
+            'content_raw': content, 'like_count': like_count, 'created_at': created_at
+        }
+
+    def duplicate_batch(topic_id):
+        return [
+            post(topic_id, 1, 1, '主楼内容（更新前）', 1),
+            post(topic_id, 2, 2, '二楼内容', 0),
+            # 同一批中同一回复出现两次：以最后一条为准
+            post(topic_id, 1, 1, '主楼内容（更新后）', 5),
+            # 不同回复ID、相同楼层：命中 uk_topic_post，更新已有楼层
+            post(topic_id, 3, 2, '二楼内容（以新ID重发）', 2),
+        ]
+
+    def read_posts(topic_id):
+        with manager.get_tuple_cursor(readonly=True) as (cursor, connection):
+            cursor.execute(
+                "SELECT id - %s, post_number, user_id, content_raw, like_count, created_at "
+                "FROM posts WHERE topic_id = %s ORDER BY post_number",
+                (topic_id * 10, topic_id)
+            )
+            return cursor.fetchall()
+
+    try:
+        manager.batch_insert_users([{'id': user_id, 'username': 'bulk_load_test'}])
+        for topic_id in topic_ids.values():
+            manager.insert_or_update_topic({
+                'id': topic_id, 'title': f'bulk load test {topic_id}', 'url': f'https://example.com/t/{topic_id}',
+                'category': 'test', 'author_id': user_id, 'reply_count': 1, 'view_count': 1,
+                'created_at': created_at, 'last_activity_at': created_at, 'tags': None
+            })
+            # 两条路径写入前已有相同的回复
+            manager.batch_insert_posts([post(topic_id, 1, 1, '主楼内容（已有）', 0)])
+
+        manager.batch_insert_posts(duplicate_batch(topic_ids['executemany']))
+
+        monkeypatch.setattr(manager, 'POST_BULK_LOAD_MIN_ROWS', 1)
+        manager.batch_insert_posts(duplicate_batch(topic_ids['bulk']))
+        assert manager._bulk_load_enabled, '服务端未开启 local_infile，未走 LOAD DATA 路径'
+
+        assert read_posts(topic_ids['bulk']) == read_posts(topic_ids['executemany'])
+    finally:
+        with manager.transaction() as cursor:
+            cursor.execute(f"DELETE FROM topics WHERE id IN ({database._placeholders(len(topic_ids))})",
+                           tuple(topic_ids.values()))
+            cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+
+
+def test_known_users_fill_lazily_and_evict_oldest(monkeypatch):
+    manager = DatabaseManager()
+    monkeypatch.setattr(manager, 'KNOWN_USERS_MAX', 3)
+    # 不预加载：尚未写入过的用户都视为未知
+    assert not manager._is_known_user(1)
+
+    manager._remember_users([1, 2, 3])
+    manager._remember_users([1])
+    manager._remember_users([4])
+
+    assert [manager._is_known_user(user_id) for user_id in (1, 2, 3, 4)] == [True, False, True, True]